@@ -0,0 +1,239 @@
+"""Admission control for database-bound API requests.
+
+Caps how many requests run at once, queues a bounded number more for a
+short time and sheds the rest with 503 and Retry-After, so latency stays
+flat for admitted requests when the database saturates instead of rising
+for everyone.
+
+With a target latency set, the cap adapts: it shrinks multiplicatively
+while the average latency over an interval is above target and grows by
+one while it is below and requests had to queue.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import Counter, deque
+from typing import Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded FIFO queue.
+    
+    Slots are handed directly to the oldest waiter on release, so queued
+    requests are admitted in arrival order.
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: int,
+        queue_size: int,
+        queue_timeout: float,
+        target_latency: float = 0.0,
+        min_concurrency: int = 1,
+        adapt_interval: float = 1.0,
+    ) -> None:
+        """
+        Initialize controller.
+        
+        Args:
+            max_concurrency: Requests allowed to run at once (upper bound when adapting)
+            queue_size: Requests allowed to wait for a slot
+            queue_timeout: Seconds a request may wait before it is shed
+            target_latency: Average latency in seconds to adapt the limit to (0 keeps it fixed)
+            min_concurrency: Lower bound of the adapted limit
+            adapt_interval: Seconds between limit adjustments
+        """
+        self.max_concurrency = max_concurrency
+        self.limit = max_concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+        self.min_concurrency = min(min_concurrency, max_concurrency)
+        self.adapt_interval = adapt_interval
+        
+        self.in_flight = 0
+        self.admitted = 0
+        self.queued = 0
+        self.shed: Counter[str] = Counter()
+        self._waiters: deque[asyncio.Future] = deque()
+        
+        self._window_started = time.monotonic()
+        self._window_latency = 0.0
+        self._window_count = 0
+        self._window_queued = False
+    
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._waiters)
+    
+    async def acquire(self) -> Optional[str]:
+        """
+        Wait for a slot.
+        
+        Returns:
+            Optional[str]: None once admitted, otherwise why the request is shed
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return None
+        
+        if len(self._waiters) >= self.queue_size:
+            self.shed["queue_full"] += 1
+            return "queue_full"
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        self._window_queued = True
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                self._waiters.remove(waiter)
+                waiter.cancel()
+                self.shed["queue_timeout"] += 1
+                return "queue_timeout"
+        except asyncio.CancelledError:
+            # Client went away; pass on a slot handed over meanwhile
+            if waiter.done():
+                self.release(None)
+            else:
+                self._waiters.remove(waiter)
+                waiter.cancel()
+            raise
+        
+        self.admitted += 1
+        return None
+    
+    def release(self, latency: Optional[float]) -> None:
+        """
+        Free a slot, handing it to the oldest waiter if the limit allows.
+        
+        Args:
+            latency: Seconds the request ran (None if it never started)
+        """
+        if latency is not None:
+            self._observe(latency)
+        
+        if self.in_flight <= self.limit:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    # The slot passes to the waiter; in_flight stays the same
+                    waiter.set_result(None)
+                    return
+        self.in_flight -= 1
+    
+    def _admit_waiters(self) -> None:
+        """Hand free slots to waiters after the limit was raised."""
+        while self.in_flight < self.limit and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+    
+    def retry_after(self) -> int:
+        """
+        Suggest how long a shed client should wait.
+        
+        Returns:
+            int: Seconds
+        """
+        return max(1, math.ceil(self.queue_timeout))
+    
+    def _observe(self, latency: float) -> None:
+        """Record a latency sample and adjust the limit once per interval."""
+        if not self.target_latency:
+            return
+        
+        self._window_latency += latency
+        self._window_count += 1
+        now = time.monotonic()
+        if now - self._window_started < self.adapt_interval:
+            return
+        
+        average = self._window_latency / self._window_count
+        if average > self.target_latency:
+            limit = max(self.min_concurrency, int(self.limit * 0.8))
+        elif self._window_queued:
+            limit = min(self.max_concurrency, self.limit + 1)
+        else:
+            limit = self.limit
+        if limit != self.limit:
+            logger.info(f"Admission limit {self.limit} -> {limit} (average latency {average * 1000:.0f} ms)")
+            self.limit = limit
+            self._admit_waiters()
+        
+        self._window_started = now
+        self._window_latency = 0.0
+        self._window_count = 0
+        self._window_queued = False
+    
+    def stats(self) -> dict:
+        """
+        Get admission statistics.
+        
+        Returns:
+            dict: Current limit, in-flight and queued requests, and totals
+        """
+        return {
+            "limit": self.limit,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "queue_size": self.queue_size,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": dict(self.shed),
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware applying an AdmissionController to HTTP requests under given path prefixes.
+    
+    Health checks and WebSocket connections bypass it.
+    """
+    
+    def __init__(self, app: ASGIApp, controller: AdmissionController, prefixes: tuple[str, ...]) -> None:
+        """
+        Initialize middleware.
+        
+        Args:
+            app: ASGI application
+            controller: Admission controller
+            prefixes: Path prefixes of database-bound routes
+        """
+        self.app = app
+        self.controller = controller
+        self.prefixes = prefixes
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefixes):
+            await self.app(scope, receive, send)
+            return
+        
+        reason = await self.controller.acquire()
+        if reason is not None:
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry"},
+                status_code=503,
+                headers={"Retry-After": str(self.controller.retry_after())},
+            )
+            await response(scope, receive, send)
+            return
+        
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(time.monotonic() - started)
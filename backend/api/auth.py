@@ -1,7 +1,12 @@
 """Telegram Web App authentication and authorization."""
+import base64
 import hashlib
 import hmac
+import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional
 from urllib.parse import parse_qs
 
@@ -12,6 +17,101 @@ from api.config import config
 logger = logging.getLogger(__name__)
 
 
+def _derive_secret_key(bot_token: str) -> bytes:
+    """
+    Derive the Web App secret key from the bot token.
+    
+    Args:
+        bot_token: Telegram bot token
+        
+    Returns:
+        bytes: HMAC key used to sign initData
+    """
+    return hmac.new(
+        key=b"WebAppData",
+        msg=bot_token.encode(),
+        digestmod=hashlib.sha256
+    ).digest()
+
+
+# The secret key depends only on the bot token, so derive it once at startup
+SECRET_KEY = _derive_secret_key(config.bot_token)
+
+# Session tokens are signed with both secrets so a default SECRET_KEY alone can't forge them
+SESSION_KEY = hmac.new(
+    key=SECRET_KEY,
+    msg=config.secret_key.encode(),
+    digestmod=hashlib.sha256
+).digest()
+
+
+class InitDataCache:
+    """Bounded LRU cache of verified initData strings with per-entry expiry."""
+    
+    def __init__(self, maxsize: int, ttl: int) -> None:
+        """
+        Initialize cache.
+        
+        Args:
+            maxsize: Maximum number of cached initData strings
+            ttl: Maximum lifetime of an entry in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, init_data: str) -> Optional[dict]:
+        """
+        Get cached user data for initData.
+        
+        Args:
+            init_data: The initData string from Telegram Web App
+            
+        Returns:
+            Optional[dict]: Cached user data or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(init_data)
+            if entry is None:
+                return None
+            expires_at, user_data = entry
+            if expires_at <= time.time():
+                del self._entries[init_data]
+                return None
+            self._entries.move_to_end(init_data)
+            return user_data
+    
+    def set(self, init_data: str, user_data: dict, expires_at: float) -> None:
+        """
+        Store verified user data for initData.
+        
+        Args:
+            init_data: The initData string from Telegram Web App
+            user_data: Parsed user data
+            expires_at: Unix timestamp after which the entry is invalid
+        """
+        if self.maxsize <= 0:
+            return
+        expires_at = min(expires_at, time.time() + self.ttl)
+        with self._lock:
+            self._entries[init_data] = (expires_at, user_data)
+            self._entries.move_to_end(init_data)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+init_data_cache = InitDataCache(
+    maxsize=config.init_data_cache_size,
+    ttl=config.init_data_cache_ttl,
+)
+
+
 def validate_telegram_web_app_data(init_data: str) -> dict:
     """
     Validate Telegram Web App initData.
@@ -25,6 +125,11 @@ def validate_telegram_web_app_data(init_data: str) -> dict:
     Raises:
         HTTPException: If validation fails
     """
+    # Fast path: the Mini App sends the same initData on every request
+    cached_user = init_data_cache.get(init_data)
+    if cached_user is not None:
+        return cached_user
+    
     try:
         # Parse the init data
         parsed_data = parse_qs(init_data)
@@ -43,31 +148,34 @@ def validate_telegram_web_app_data(init_data: str) -> dict:
         
         data_check_string = "\n".join(data_check_string_parts)
         
-        # Create secret key
-        secret_key = hmac.new(
-            key=b"WebAppData",
-            msg=config.bot_token.encode(),
-            digestmod=hashlib.sha256
-        ).digest()
-        
         # Calculate hash
         calculated_hash = hmac.new(
-            key=secret_key,
+            key=SECRET_KEY,
             msg=data_check_string.encode(),
             digestmod=hashlib.sha256
         ).hexdigest()
         
         # Verify hash
-        if calculated_hash != received_hash:
+        if not hmac.compare_digest(calculated_hash, received_hash):
             raise HTTPException(status_code=401, detail="Invalid initData hash")
         
+        # Check initData age
+        expires_at = time.time() + config.init_data_cache_ttl
+        if config.init_data_max_age > 0:
+            auth_date = int(parsed_data.get("auth_date", ["0"])[0])
+            expires_at = auth_date + config.init_data_max_age
+            if expires_at <= time.time():
+                raise HTTPException(status_code=401, detail="initData has expired")
+        
         # Parse user data
         user_data = {}
         if "user" in parsed_data:
-            import json
             user_json = parsed_data["user"][0]
             user_data = json.loads(user_json)
         
+        if user_data:
+            init_data_cache.set(init_data, user_data, expires_at)
+        
         return user_data
         
     except HTTPException:
@@ -77,11 +185,74 @@ def validate_telegram_web_app_data(init_data: str) -> dict:
         raise HTTPException(status_code=401, detail="Invalid initData")
 
 
-async def get_current_user(
+def _b64encode(data: bytes) -> str:
+    """Encode bytes as unpadded URL-safe base64."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    """Decode unpadded URL-safe base64."""
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def create_session_token(user_id: int, telegram_id: int) -> tuple[str, int]:
+    """
+    Create a signed session token for an authenticated user.
+    
+    Args:
+        user_id: Internal user ID
+        telegram_id: Telegram user ID
+        
+    Returns:
+        tuple[str, int]: Token and its expiry as a Unix timestamp
+    """
+    expires_at = int(time.time()) + config.session_token_ttl
+    payload = _b64encode(
+        json.dumps(
+            {"uid": user_id, "tid": telegram_id, "exp": expires_at},
+            separators=(",", ":"),
+        ).encode()
+    )
+    signature = hmac.new(SESSION_KEY, payload.encode(), hashlib.sha256).digest()
+    return f"{payload}.{_b64encode(signature)}", expires_at
+
+
+def verify_session_token(token: str) -> dict:
+    """
+    Verify a session token without touching the database.
+    
+    Args:
+        token: Token issued by create_session_token
+        
+    Returns:
+        dict: User data with Telegram ID under "id" and internal ID under "user_id"
+        
+    Raises:
+        HTTPException: If the token is malformed, forged or expired
+    """
+    try:
+        payload, signature = token.split(".", 1)
+        expected = hmac.new(SESSION_KEY, payload.encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            raise HTTPException(status_code=401, detail="Invalid session token")
+        
+        claims = json.loads(_b64decode(payload))
+        if claims["exp"] <= time.time():
+            raise HTTPException(status_code=401, detail="Session token has expired")
+        
+        return {"id": claims["tid"], "user_id": claims["uid"]}
+        
+    except HTTPException:
+        raise
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid session token")
+
+
+async def get_web_app_user(
     authorization: Optional[str] = Header(None)
 ) -> dict:
     """
-    Dependency to get current user from Telegram Web App initData.
+    Dependency to get Telegram user data from raw initData only.
     
     Args:
         authorization: Authorization header containing initData
@@ -95,7 +266,37 @@ async def get_current_user(
     if not authorization:
         raise HTTPException(status_code=401, detail="Missing authorization header")
     
-    # The authorization header should contain the raw initData
+    user_data = validate_telegram_web_app_data(authorization)
+    
+    if not user_data:
+        raise HTTPException(status_code=401, detail="Invalid user data")
+    
+    return user_data
+
+
+async def get_current_user(
+    authorization: Optional[str] = Header(None)
+) -> dict:
+    """
+    Dependency to get current user from a session token or Telegram Web App initData.
+    
+    Args:
+        authorization: Authorization header containing "Bearer <token>" or raw initData
+        
+    Returns:
+        dict: User data
+        
+    Raises:
+        HTTPException: If authentication fails
+    """
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Missing authorization header")
+    
+    # Session tokens carry the resolved internal user ID
+    if authorization.startswith("Bearer "):
+        return verify_session_token(authorization[len("Bearer "):])
+    
+    # Otherwise the authorization header should contain the raw initData
     init_data = authorization
     user_data = validate_telegram_web_app_data(init_data)
     
@@ -0,0 +1,184 @@
+"""Content negotiation between JSON and MessagePack.
+
+Routers opt in with ``route_class=NegotiatedRoute``. Request bodies sent as
+``application/msgpack`` are decoded before validation, and JSON responses
+are re-encoded as MessagePack when the Accept header prefers it. Endpoints
+that produce their own bodies (cached or streamed) check ``prefers_msgpack``
+and encode with ``packb`` directly. JSON stays the default.
+
+MessagePack bodies carry the same data as the JSON ones (datetimes stay
+ISO 8601 strings), so clients decode to the same objects either way.
+"""
+from typing import Any, Callable, Coroutine, Optional
+
+import msgpack
+import orjson
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Media types accepted for MessagePack, including the legacy unregistered one
+MSGPACK_MEDIA_TYPES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack"}
+
+
+def media_type_of(content_type: Optional[str]) -> str:
+    """
+    Strip parameters from a Content-Type header.
+    
+    Args:
+        content_type: Content-Type header (optional)
+        
+    Returns:
+        str: Lowercase media type ("" if missing)
+    """
+    return (content_type or "").split(";", 1)[0].strip().lower()
+
+
+def prefers_msgpack(accept: Optional[str]) -> bool:
+    """
+    Check whether an Accept header asks for MessagePack over JSON.
+    
+    MessagePack must be listed explicitly with a non-zero quality that is
+    at least that of application/json; wildcards alone get JSON.
+    
+    Args:
+        accept: Accept header (optional)
+        
+    Returns:
+        bool: True if the response should be MessagePack
+    """
+    if not accept or "msgpack" not in accept:
+        return False
+    
+    msgpack_q = json_q = 0.0
+    for part in accept.split(","):
+        media_type, *params = part.split(";")
+        media_type = media_type.strip().lower()
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_q = max(msgpack_q, q)
+        elif media_type == JSON_MEDIA_TYPE:
+            json_q = max(json_q, q)
+    
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+def packb(data: Any) -> bytes:
+    """
+    Serialize data to MessagePack.
+    
+    Values are first converted the way the JSON responses convert them.
+    Going through orjson, which formats datetimes in C, is faster than a
+    Python default hook called for every datetime.
+    
+    Args:
+        data: Data orjson can serialize, e.g. dicts of datetimes and enums
+        
+    Returns:
+        bytes: MessagePack body
+    """
+    return msgpack.packb(orjson.loads(orjson.dumps(data, option=orjson.OPT_UTC_Z)))
+
+
+def unpackb(body: bytes) -> Any:
+    """
+    Deserialize a MessagePack body.
+    
+    Args:
+        body: MessagePack body
+        
+    Returns:
+        Any: Decoded data
+    """
+    return msgpack.unpackb(body)
+
+
+class MsgPackRequest(Request):
+    """Request whose MessagePack body is handed to validation as if it were JSON."""
+    
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = unpackb(await self.body())
+        return self._json
+
+
+def msgpack_request(request: Request) -> Request:
+    """
+    Wrap a request with a MessagePack body so FastAPI parses it like JSON.
+    
+    FastAPI only calls Request.json() for JSON content types, so the
+    wrapped request reports application/json while decoding MessagePack.
+    
+    Args:
+        request: Incoming request
+        
+    Returns:
+        Request: Request to hand to the endpoint
+    """
+    scope = dict(request.scope)
+    scope["headers"] = [
+        (name, value) for name, value in request.scope["headers"] if name != b"content-type"
+    ] + [(b"content-type", JSON_MEDIA_TYPE.encode())]
+    return MsgPackRequest(scope, request.receive)
+
+
+def msgpack_response(response: Response) -> Response:
+    """
+    Re-encode a JSON response as MessagePack, keeping status and headers.
+    
+    Args:
+        response: JSON response
+        
+    Returns:
+        Response: MessagePack response
+    """
+    converted = Response(
+        content=msgpack.packb(orjson.loads(response.body)),
+        status_code=response.status_code,
+        media_type=MSGPACK_MEDIA_TYPE,
+        background=response.background,
+    )
+    converted.raw_headers.extend(
+        (name, value)
+        for name, value in response.raw_headers
+        if name not in (b"content-type", b"content-length")
+    )
+    return converted
+
+
+class NegotiatedRoute(APIRoute):
+    """
+    Route accepting and producing MessagePack as well as JSON.
+    
+    Error responses raised as HTTPException are rendered by the app's
+    exception handlers and stay JSON.
+    """
+    
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        
+        async def negotiated_handler(request: Request) -> Response:
+            if media_type_of(request.headers.get("content-type")) in MSGPACK_MEDIA_TYPES:
+                request = msgpack_request(request)
+            
+            response = await handler(request)
+            
+            if (
+                prefers_msgpack(request.headers.get("accept"))
+                and media_type_of(response.headers.get("content-type")) == JSON_MEDIA_TYPE
+                and hasattr(response, "body")
+            ):
+                response = msgpack_response(response)
+            response.headers.add_vary_header("Accept")
+            return response
+        
+        return negotiated_handler
@@ -1,9 +1,15 @@
 """API dependencies."""
-from typing import AsyncGenerator
+import math
+from typing import AsyncGenerator, Awaitable, Callable
 
+from fastapi import Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.auth import get_current_user, get_web_app_user
+from api.config import config
 from database import get_db
+from shared.query_stats import set_query_budget
+from shared.rate_limit import parse_rate_limit, rate_limiter
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
@@ -15,3 +21,65 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """
     async for session in get_db():
         yield session
+
+
+def rate_limit(
+    scope: str,
+    spec: str,
+    authenticate: Callable[..., Awaitable[dict]] = get_current_user,
+) -> Callable[..., Awaitable[None]]:
+    """
+    Build a dependency limiting how often each user may call a route.
+    
+    Add it to the route's dependencies so it runs before the endpoint
+    touches the database. Users are keyed by Telegram ID.
+    
+    Args:
+        scope: Bucket name; routes sharing it share the budget
+        spec: Limit as "N/S" (N requests per S seconds; "0" disables)
+        authenticate: Dependency returning the user, as used by the route
+        
+    Returns:
+        Callable: Dependency raising 429 with Retry-After when over the limit
+    """
+    limit = parse_rate_limit(spec)
+    
+    async def dependency(current_user: dict = Depends(authenticate)) -> None:
+        if limit is None:
+            return
+        wait = await rate_limiter.acquire(scope, current_user["id"], limit)
+        if wait:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+    
+    return dependency
+
+
+def query_budget(statements: int) -> Callable[[], Awaitable[None]]:
+    """
+    Build a dependency declaring how many database statements a route may run.
+    
+    Count a cold cache: every statement the route can run, including
+    authentication and the task list cache rebuilding. Going over the
+    budget is logged, or fails the request with QUERY_BUDGET_STRICT=true.
+    
+    Args:
+        statements: Maximum number of statements per request
+        
+    Returns:
+        Callable: Dependency recording the budget for the current request
+    """
+    async def dependency() -> None:
+        set_query_budget(statements)
+    
+    return dependency
+
+
+# Budgets shared by the routes of each kind
+limit_reads = rate_limit("read", config.rate_limit_read)
+limit_writes = rate_limit("write", config.rate_limit_write)
+limit_exports = rate_limit("export", config.rate_limit_export)
+limit_auth = rate_limit("auth", config.rate_limit_auth, get_web_app_user)
@@ -1,15 +1,29 @@
 """FastAPI main application."""
+import asyncio
 import logging
 import os
 import sys
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
+from api.admission import AdmissionControlMiddleware, AdmissionController
 from api.config import config
-from api.routers import tasks, webhook
-from database import close_db, init_db
+from api.metrics import MetricsMiddleware, QueryStatsMiddleware
+from api.tracing import TracingMiddleware
+from api.routers import auth, bootstrap, tasks, webhook
+from database import close_db, get_pool_stats, init_db, warm_pool
+from database.changes import run_compaction
+from shared.metrics import instrument_database
+from shared.query_stats import instrument_queries
+from shared.rate_limit import rate_limiter
+from shared.redis_client import close_redis, init_redis
+from shared.single_flight import single_flight
+from shared.task_cache import task_list_cache
+from shared.task_events import task_event_hub
+from shared.tracing import trace_database
 
 # Configure logging
 logging.basicConfig(
@@ -37,10 +51,23 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize database: {e}")
         sys.exit(1)
     
+    try:
+        warmed = await warm_pool()
+        logger.info(f"Database pool warmed with {warmed} connections")
+    except Exception as e:
+        logger.warning(f"Failed to warm database pool: {e}")
+    
+    init_redis(config.redis_url)
+    
+    compaction = asyncio.create_task(run_compaction())
+    
     yield
     
     # Shutdown
     logger.info("Shutting down FastAPI application...")
+    compaction.cancel()
+    await task_event_hub.close()
+    await close_redis()
     await close_db()
     logger.info("Database connections closed")
 
@@ -53,6 +80,20 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Count statements and DB time per request
+app.add_middleware(QueryStatsMiddleware, headers=config.query_stats_headers)
+instrument_queries()
+
+# Cap concurrent database-bound requests and shed the excess (inside CORS so 503s carry CORS headers)
+admission = AdmissionController(
+    max_concurrency=config.admission_max_concurrency,
+    queue_size=config.admission_queue_size,
+    queue_timeout=config.admission_queue_timeout,
+    target_latency=config.admission_target_latency,
+    min_concurrency=config.admission_min_concurrency,
+)
+app.add_middleware(AdmissionControlMiddleware, controller=admission, prefixes=("/api/", "/webhook"))
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -60,8 +101,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Retry-After", "X-DB-Queries", "Server-Timing"],
 )
 
+# Record request latency and spans outermost, so they include time queued by admission control
+app.add_middleware(TracingMiddleware)
+app.add_middleware(MetricsMiddleware)
+instrument_database()
+trace_database()
+
 # Include routers
 # Webhook only needed in production
 if os.getenv("USE_WEBHOOK", "false").lower() == "true":
@@ -70,7 +118,9 @@ if os.getenv("USE_WEBHOOK", "false").lower() == "true":
 else:
     logger.info("Webhook router disabled (using polling mode)")
 
+app.include_router(auth.router)
 app.include_router(tasks.router)
+app.include_router(bootstrap.router)
 
 
 @app.get("/")
@@ -99,6 +149,83 @@ async def health_check() -> dict:
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Prometheus metrics for this process (and the bot in webhook mode).
+    
+    Returns:
+        Response: Metrics in the Prometheus text format
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/health/db")
+async def database_health() -> dict:
+    """
+    Database connection pool statistics.
+    
+    Returns:
+        dict: Pool statistics
+    """
+    return {"pool": get_pool_stats()}
+
+
+@app.get("/health/events")
+async def events_health() -> dict:
+    """
+    Task event push statistics for this process.
+    
+    Returns:
+        dict: Open connections and events dropped by back-pressure
+    """
+    return {"connections": task_event_hub.connections, "dropped": task_event_hub.dropped}
+
+
+@app.get("/health/cache")
+async def cache_health() -> dict:
+    """
+    Task list cache statistics for this process.
+    
+    Returns:
+        dict: Hits and rebuilds (coalesced misses are counted under /health/coalescing)
+    """
+    return {"hits": task_list_cache.hits, "misses": task_list_cache.misses}
+
+
+@app.get("/health/coalescing")
+async def coalescing_health() -> dict:
+    """
+    Read coalescing statistics for this process.
+    
+    Returns:
+        dict: Calls, executed calls and coalesced share per read
+    """
+    return {"reads": single_flight.stats()}
+
+
+@app.get("/health/admission")
+async def admission_health() -> dict:
+    """
+    Admission control statistics for this process.
+    
+    Returns:
+        dict: Concurrency limit, in-flight requests, queue depth and shed counts
+    """
+    return admission.stats()
+
+
+@app.get("/health/ratelimit")
+async def rate_limit_health() -> dict:
+    """
+    Rate limiting statistics for this process.
+    
+    Returns:
+        dict: Rejected calls per bucket (API routes and bot update types)
+    """
+    return {"rejected": dict(rate_limiter.rejected)}
+
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -0,0 +1,99 @@
+"""Request metrics for the API."""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from shared.metrics import HTTP_REQUEST_DURATION
+from shared.query_stats import track_queries
+
+# Route label of requests no route matched (404s and requests shed before routing)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording HTTP request latency by route template.
+    
+    Routes are labelled by their path template ("/api/tasks/{task_id}"),
+    never the raw path, so the number of series stays bounded.
+    WebSocket connections are not recorded.
+    """
+    
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Initialize middleware.
+        
+        Args:
+            app: ASGI application
+        """
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status = 500
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                str(status),
+            ).observe(time.perf_counter() - started)
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware counting database statements and time per HTTP request.
+    
+    The counters are logged (as db_queries/db_time_ms fields) when the
+    request ends, and optionally sent as X-DB-Queries and Server-Timing
+    headers. Headers carry the statements run before the response started;
+    streamed responses may run more afterwards, which only the log shows.
+    """
+    
+    def __init__(self, app: ASGIApp, headers: bool = True) -> None:
+        """
+        Initialize middleware.
+        
+        Args:
+            app: ASGI application
+            headers: Whether to add the counters to responses
+        """
+        self.app = app
+        self.headers = headers
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        with track_queries(f"{scope['method']} {scope['path']}") as stats:
+            
+            async def send_with_stats(message: Message) -> None:
+                if self.headers and message["type"] == "http.response.start":
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-db-queries", str(stats.statements).encode()),
+                        (b"server-timing", f"db;dur={stats.duration * 1000:.3f}".encode()),
+                    ]
+                await send(message)
+            
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    stats.name = f"{scope['method']} {route.path}"
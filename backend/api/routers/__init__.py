@@ -1,4 +1,4 @@
 """Routers package initialization."""
-from api.routers import tasks, webhook
+from api.routers import auth, tasks, webhook
 
-__all__ = ["webhook", "tasks"]
+__all__ = ["webhook", "auth", "tasks"]
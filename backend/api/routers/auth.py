@@ -0,0 +1,50 @@
+"""Auth router for exchanging initData for session tokens."""
+import logging
+import time
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.auth import create_session_token, get_web_app_user
+from api.dependencies import get_session, limit_auth, query_budget
+from api.routers.tasks import get_current_user_id
+from shared.schemas import SessionResponse
+
+router = APIRouter(prefix="/api/auth", tags=["auth"])
+logger = logging.getLogger(__name__)
+
+
+@router.post("/session", response_model=SessionResponse, dependencies=[Depends(limit_auth), Depends(query_budget(1))])
+async def create_session(
+    session: AsyncSession = Depends(get_session),
+    web_app_user: dict = Depends(get_web_app_user)
+) -> SessionResponse:
+    """
+    Validate initData once and issue a short-lived session token.
+    
+    Args:
+        session: Database session
+        web_app_user: User data from validated initData
+        
+    Returns:
+        SessionResponse: Signed session token
+    """
+    try:
+        # Get user
+        user_id = await get_current_user_id(web_app_user, session)
+        telegram_id = web_app_user["id"]
+        
+        token, expires_at = create_session_token(user_id, telegram_id)
+        
+        return SessionResponse(
+            token=token,
+            expires_in=max(expires_at - int(time.time()), 0),
+            user_id=user_id,
+            telegram_id=telegram_id,
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating session: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error creating session")
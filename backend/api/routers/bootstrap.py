@@ -0,0 +1,112 @@
+"""Bootstrap router returning everything the Web App shows on startup."""
+import logging
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.auth import get_current_user
+from api.content import JSON_MEDIA_TYPE, NegotiatedRoute
+from api.dependencies import get_session, limit_reads, query_budget
+from api.routers.tasks import MAX_PAGE_SIZE, get_current_user_id, get_task_page
+from database.counters import empty_task_counters
+from database.models import User, UserTaskCounters
+from shared.schemas import BootstrapResponse, TaskStatsResponse, UserResponse
+
+router = APIRouter(prefix="/api/bootstrap", tags=["bootstrap"], route_class=NegotiatedRoute)
+logger = logging.getLogger(__name__)
+
+# Tasks in the first page unless ?limit= is given
+BOOTSTRAP_PAGE_SIZE = 50
+
+
+async def load_profile_and_counters(session: AsyncSession, user_id: int) -> tuple[UserResponse, UserTaskCounters]:
+    """
+    Get the user's profile and task counters with one primary key lookup.
+    
+    Args:
+        session: Database session
+        user_id: Internal user ID
+        
+    Returns:
+        tuple[UserResponse, UserTaskCounters]: Profile and counters (all zero if the user has never had a task)
+        
+    Raises:
+        HTTPException: If user not found
+    """
+    result = await session.execute(
+        select(User, UserTaskCounters)
+        .outerjoin(UserTaskCounters, UserTaskCounters.user_id == User.id)
+        .where(User.id == user_id)
+    )
+    row = result.one_or_none()
+    
+    if row is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    user, counters = row
+    return UserResponse.model_validate(user), counters or empty_task_counters(user_id)
+
+
+@router.get("", response_model=BootstrapResponse, dependencies=[Depends(limit_reads), Depends(query_budget(3))])
+async def bootstrap(
+    limit: int = Query(BOOTSTRAP_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_session),
+    current_user: dict = Depends(get_current_user)
+) -> Response:
+    """
+    Get the user's profile, first page of tasks and statistics in one request.
+    
+    Everything runs on the request's session, so a bootstrap holds one
+    pooled connection like any other request (the admission limit assumes
+    this). The profile and counters come from one joined primary key
+    lookup; the counters carry the data version the task page is built at.
+    The page comes from the task list cache and is spliced into the body
+    without being parsed again. Load further pages with
+    GET /api/tasks?limit=...&cursor=next_cursor.
+    
+    version is the data version the tasks are at least as new as; it can
+    be used as since for GET /api/tasks/changes.
+    
+    Args:
+        limit: Size of the first page of tasks
+        session: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Response: JSON (or MessagePack) BootstrapResponse
+    """
+    try:
+        # Get user
+        user_id = await get_current_user_id(current_user, session)
+        
+        user, counters = await load_profile_and_counters(session, user_id)
+        version = counters.data_version
+        next_cursor, tasks = await get_task_page(session, user_id, version, limit=limit)
+        
+        stats = TaskStatsResponse(
+            total=counters.total,
+            todo=counters.todo,
+            in_progress=counters.in_progress,
+            done=counters.done,
+            high_priority=counters.high_priority,
+            medium_priority=counters.medium_priority,
+            low_priority=counters.low_priority,
+        )
+        
+        body = b"".join((
+            b'{"user":', user.model_dump_json().encode(),
+            b',"tasks":', tasks,
+            b',"next_cursor":', orjson.dumps(next_cursor),
+            b',"stats":', stats.model_dump_json().encode(),
+            b',"version":', str(version).encode(),
+            b"}",
+        ))
+        return Response(content=body, media_type=JSON_MEDIA_TYPE, headers={"Cache-Control": "private, no-cache"})
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error bootstrapping: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error fetching startup data")
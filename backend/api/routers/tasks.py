@@ -1,19 +1,238 @@
 """Tasks router for CRUD operations on tasks."""
+import asyncio
+import base64
+import csv
+import io
+import json
 import logging
-from typing import List
+from datetime import datetime
+from typing import AsyncIterator, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func, select, case
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Integer, Select, any_, delete, insert, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.auth import get_current_user
-from api.dependencies import get_session
-from database.models import Task, TaskPriority, TaskStatus, User
-from shared.schemas import TaskCreate, TaskResponse, TaskStatsResponse, TaskUpdate
+from api.auth import get_current_user, verify_session_token
+from api.config import config
+from api.content import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, NegotiatedRoute, packb, prefers_msgpack
+from api.dependencies import get_session, limit_exports, limit_reads, limit_writes, query_budget
+from database import async_session_maker
+from database.counters import apply_task_delta, get_data_version, get_task_counters
+from database.models import Task, TaskChange, TaskPriority, TaskStatus, User
+from shared.schemas import (
+    TaskBatchRequest,
+    TaskBatchResponse,
+    TaskBatchResult,
+    TaskChangesResponse,
+    TaskCreate,
+    TaskResponse,
+    TaskStatsResponse,
+    TaskUpdate,
+)
+from shared.task_cache import task_list_cache
+from shared.task_events import publish_task_event, task_event_hub
+from shared.user_resolver import user_resolver
 
-router = APIRouter(prefix="/api/tasks", tags=["tasks"])
+router = APIRouter(prefix="/api/tasks", tags=["tasks"], route_class=NegotiatedRoute)
 logger = logging.getLogger(__name__)
 
+# Maximum page size for GET /api/tasks?limit=
+MAX_PAGE_SIZE = 200
+
+# Rows fetched per round trip from the server-side cursor during export
+EXPORT_BATCH_SIZE = 500
+
+# Content types of the export formats
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "msgpack": MSGPACK_MEDIA_TYPE,
+}
+
+# Task columns in TaskResponse field order
+TASK_COLUMNS = (
+    Task.title,
+    Task.description,
+    Task.priority,
+    Task.deadline,
+    Task.id,
+    Task.user_id,
+    Task.status,
+    Task.created_at,
+    Task.updated_at,
+)
+TASK_FIELDS = [column.key for column in TASK_COLUMNS]
+
+
+def task_row_to_dict(row) -> dict:
+    """
+    Convert a row of TASK_COLUMNS to JSON-compatible values.
+    
+    Args:
+        row: Row selected with TASK_COLUMNS
+        
+    Returns:
+        dict: Task fields with enums as values and datetimes in ISO 8601
+    """
+    data = row._asdict()
+    data["priority"] = row.priority.value
+    data["status"] = row.status.value
+    for field in ("deadline", "created_at", "updated_at"):
+        if data[field] is not None:
+            data[field] = data[field].isoformat()
+    return data
+
+
+def encode_task_rows(rows, media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    """
+    Serialize rows of TASK_COLUMNS straight to JSON or MessagePack.
+    
+    Produces the same JSON as List[TaskResponse] without building a model
+    per task: keys follow TASK_COLUMNS (TaskResponse field order), enums
+    become their values and UTC datetimes end in "Z" like Pydantic's.
+    MessagePack holds the same values.
+    
+    Args:
+        rows: Rows selected with TASK_COLUMNS
+        media_type: JSON_MEDIA_TYPE or MSGPACK_MEDIA_TYPE
+        
+    Returns:
+        bytes: Array of tasks
+    """
+    tasks = [dict(zip(TASK_FIELDS, row)) for row in rows]
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return packb(tasks)
+    return orjson.dumps(tasks, option=orjson.OPT_UTC_Z)
+
+
+def task_etag(user_id: int, version: int) -> str:
+    """
+    Build the ETag for a user's data at a given data version.
+    
+    Args:
+        user_id: Internal user ID
+        version: User's data version
+        
+    Returns:
+        str: Weak entity tag
+    """
+    return f'W/"{user_id}-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison).
+    
+    Args:
+        if_none_match: If-None-Match request header (optional)
+        etag: Current entity tag
+        
+    Returns:
+        bool: True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Build a 304 Not Modified response for a conditional read.
+    
+    Args:
+        etag: Current entity tag
+        
+    Returns:
+        Response: Empty 304 response
+    """
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
+def encode_cursor(created_at: datetime, task_id: int) -> str:
+    """
+    Encode the position after a task as an opaque cursor.
+    
+    Args:
+        created_at: Task creation time
+        task_id: Task ID
+        
+    Returns:
+        str: URL-safe cursor
+    """
+    raw = json.dumps([created_at.isoformat(), task_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Args:
+        cursor: Opaque cursor
+        
+    Returns:
+        tuple[datetime, int]: Creation time and ID of the last seen task
+        
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, task_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(task_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def build_task_list_query(
+    user_id: int,
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    columns: tuple = (Task,),
+) -> Select:
+    """
+    Build the query behind the task list, newest first.
+    
+    Pages are keyset-based on (created_at, id), so each page costs the same
+    regardless of how far the client has scrolled. One extra row is fetched
+    to tell whether another page exists.
+    
+    Args:
+        user_id: Internal user ID
+        status: Filter by status (optional)
+        priority: Filter by priority (optional)
+        cursor: Position after which to start (optional)
+        limit: Page size (optional, all tasks if None)
+        columns: Entities or columns to select
+        
+    Returns:
+        Select: Task list query
+    """
+    query = select(*columns).where(Task.user_id == user_id)
+    
+    if status:
+        query = query.where(Task.status == status)
+    if priority:
+        query = query.where(Task.priority == priority)
+    if cursor:
+        created_at, task_id = decode_cursor(cursor)
+        query = query.where(tuple_(Task.created_at, Task.id) < tuple_(created_at, task_id))
+    
+    query = query.order_by(Task.created_at.desc(), Task.id.desc())
+    
+    if limit:
+        query = query.limit(limit + 1)
+    
+    return query
+
 
 async def get_user_by_telegram_id(
     telegram_id: int,
@@ -43,43 +262,161 @@ async def get_user_by_telegram_id(
     return user
 
 
-@router.get("", response_model=List[TaskResponse])
+async def get_current_user_id(
+    current_user: dict,
+    session: AsyncSession
+) -> int:
+    """
+    Resolve the internal user ID of the authenticated user.
+    
+    Session tokens already carry the internal ID; raw initData goes through
+    the shared resolver cache and only hits the database on a miss.
+    
+    Args:
+        current_user: Current authenticated user
+        session: Database session
+        
+    Returns:
+        int: Internal user ID
+        
+    Raises:
+        HTTPException: If user not found
+    """
+    if "user_id" in current_user:
+        return current_user["user_id"]
+    
+    user_id = await user_resolver.resolve(session, current_user["id"])
+    
+    if user_id is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return user_id
+
+
+def task_owner_filter(current_user: dict) -> tuple:
+    """
+    Build WHERE clauses restricting tasks to the authenticated user.
+    
+    When the internal ID isn't known without I/O, ownership is checked by
+    joining users on telegram_id inside the same statement, so the write
+    doesn't need a separate user lookup first.
+    
+    Args:
+        current_user: Current authenticated user
+        
+    Returns:
+        tuple: Clauses to pass to .where()
+    """
+    user_id = current_user.get("user_id") or user_resolver.peek(current_user["id"])
+    if user_id is not None:
+        return (Task.user_id == user_id,)
+    return (Task.user_id == User.id, User.telegram_id == current_user["id"])
+
+
+async def get_task_page(
+    session: AsyncSession,
+    user_id: int,
+    version: int,
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    media_type: str = JSON_MEDIA_TYPE,
+) -> tuple[Optional[str], bytes]:
+    """
+    Get a serialized page of tasks from the task list cache, building it on a miss.
+    
+    Args:
+        session: Database session used on a miss
+        user_id: Internal user ID
+        version: User's data version read before the call
+        status: Filter by status (optional)
+        priority: Filter by priority (optional)
+        limit: Page size (optional, all tasks if None)
+        cursor: Position after which to start (optional)
+        media_type: JSON_MEDIA_TYPE or MSGPACK_MEDIA_TYPE
+        
+    Returns:
+        tuple[Optional[str], bytes]: Cursor of the next page (None on the last page) and the body
+    """
+    async def build() -> bytes:
+        # Plain rows, no ORM identity map or per-task models
+        query = build_task_list_query(user_id, status, priority, cursor, limit, columns=TASK_COLUMNS)
+        result = await session.execute(query)
+        rows = result.all()
+        
+        next_cursor = ""
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        
+        return next_cursor.encode() + b"\n" + encode_task_rows(rows, media_type)
+    
+    variant = ":".join(
+        str(value or "")
+        for value in (media_type, status and status.value, priority and priority.value, limit, cursor)
+    )
+    next_cursor, body = (await task_list_cache.get_or_build(user_id, version, variant, build)).split(b"\n", 1)
+    return next_cursor.decode() or None, body
+
+
+@router.get("", response_model=List[TaskResponse], dependencies=[Depends(limit_reads), Depends(query_budget(3))])
 async def list_tasks(
     status: TaskStatus | None = None,
     priority: TaskPriority | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    if_none_match: str | None = Header(None),
+    accept: str | None = Header(None),
     session: AsyncSession = Depends(get_session),
     current_user: dict = Depends(get_current_user)
-) -> List[Task]:
+) -> Response:
     """
     Get list of user's tasks.
     
+    Without limit all tasks are returned. With limit the response holds one
+    page and the X-Next-Cursor header carries the cursor for the next one
+    (absent on the last page).
+    
+    The ETag is the user's data version, read from the database before the
+    list so the body is never older than its tag. A matching If-None-Match
+    gets 304 without running the list query, and serialized lists are
+    cached per version and filter set so unchanged data isn't queried
+    again. Concurrent identical list builds share one query. The body is
+    MessagePack when the Accept header prefers it.
+    
     Args:
         status: Filter by status (optional)
         priority: Filter by priority (optional)
+        limit: Page size (optional)
+        cursor: Cursor from a previous page's X-Next-Cursor (optional)
+        if_none_match: ETag of the client's cached copy (optional)
+        accept: Accept header (optional)
         session: Database session
         current_user: Current authenticated user
         
     Returns:
-        List[Task]: List of tasks
+        Response: JSON or MessagePack list of tasks
     """
     try:
         # Get user
-        user = await get_user_by_telegram_id(current_user["id"], session)
-        
-        # Build query
-        query = select(Task).where(Task.user_id == user.id)
+        user_id = await get_current_user_id(current_user, session)
         
-        if status:
-            query = query.where(Task.status == status)
-        if priority:
-            query = query.where(Task.priority == priority)
+        version = await get_data_version(session, user_id)
         
-        query = query.order_by(Task.created_at.desc())
+        etag = task_etag(user_id, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
         
-        result = await session.execute(query)
-        tasks = result.scalars().all()
+        media_type = MSGPACK_MEDIA_TYPE if prefers_msgpack(accept) else JSON_MEDIA_TYPE
+        next_cursor, body = await get_task_page(
+            session, user_id, version, status, priority, limit, cursor, media_type
+        )
         
-        return tasks
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        return Response(content=body, media_type=media_type, headers=headers)
         
     except HTTPException:
         raise
@@ -88,7 +425,7 @@ async def list_tasks(
         raise HTTPException(status_code=500, detail="Error fetching tasks")
 
 
-@router.post("", response_model=TaskResponse)
+@router.post("", response_model=TaskResponse, dependencies=[Depends(limit_writes), Depends(query_budget(4))])
 async def create_task(
     task_data: TaskCreate,
     session: AsyncSession = Depends(get_session),
@@ -107,11 +444,11 @@ async def create_task(
     """
     try:
         # Get user
-        user = await get_user_by_telegram_id(current_user["id"], session)
+        user_id = await get_current_user_id(current_user, session)
         
         # Create task
         task = Task(
-            user_id=user.id,
+            user_id=user_id,
             title=task_data.title,
             description=task_data.description,
             priority=task_data.priority,
@@ -120,8 +457,13 @@ async def create_task(
         )
         
         session.add(task)
+        await session.flush()
+        version = await apply_task_delta(
+            session, user_id, added=[(task.status, task.priority)], changed=[task.id]
+        )
         await session.commit()
         await session.refresh(task)
+        await publish_task_event(user_id, version, changed=[task.id])
         
         return task
         
@@ -132,15 +474,15 @@ async def create_task(
         raise HTTPException(status_code=500, detail="Error creating task")
 
 
-@router.put("/{task_id}", response_model=TaskResponse)
+@router.put("/{task_id}", response_model=TaskResponse, dependencies=[Depends(limit_writes), Depends(query_budget(3))])
 async def update_task(
     task_id: int,
     task_data: TaskUpdate,
     session: AsyncSession = Depends(get_session),
     current_user: dict = Depends(get_current_user)
-) -> Task:
+) -> TaskResponse:
     """
-    Update a task.
+    Update a task with a single ownership-scoped UPDATE ... RETURNING.
     
     Args:
         task_id: Task ID
@@ -149,30 +491,48 @@ async def update_task(
         current_user: Current authenticated user
         
     Returns:
-        Task: Updated task
+        TaskResponse: Updated task
     """
     try:
-        # Get user
-        user = await get_user_by_telegram_id(current_user["id"], session)
+        owner = task_owner_filter(current_user)
+        update_data = task_data.model_dump(exclude_unset=True)
         
-        # Get task
+        if not update_data:
+            result = await session.execute(select(*TASK_COLUMNS).where(Task.id == task_id, *owner))
+            row = result.one_or_none()
+            if row is None:
+                raise HTTPException(status_code=404, detail="Task not found")
+            return TaskResponse.model_validate(row)
+        
+        # Lock the owned row and update it in one statement, returning old and new keys
+        old = (
+            select(Task.id, Task.status, Task.priority)
+            .where(Task.id == task_id, *owner)
+            .with_for_update(of=Task)
+            .cte("old")
+        )
         result = await session.execute(
-            select(Task).where(Task.id == task_id, Task.user_id == user.id)
+            update(Task)
+            .where(Task.id == old.c.id)
+            .values(**update_data)
+            .returning(*TASK_COLUMNS, old.c.status.label("old_status"), old.c.priority.label("old_priority"))
         )
-        task = result.scalar_one_or_none()
+        row = result.one_or_none()
         
-        if not task:
+        if row is None:
             raise HTTPException(status_code=404, detail="Task not found")
         
-        # Update fields
-        update_data = task_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(task, field, value)
-        
+        version = await apply_task_delta(
+            session,
+            row.user_id,
+            removed=[(row.old_status, row.old_priority)],
+            added=[(row.status, row.priority)],
+            changed=[row.id],
+        )
         await session.commit()
-        await session.refresh(task)
+        await publish_task_event(row.user_id, version, changed=[row.id])
         
-        return task
+        return TaskResponse.model_validate(row)
         
     except HTTPException:
         raise
@@ -181,14 +541,14 @@ async def update_task(
         raise HTTPException(status_code=500, detail="Error updating task")
 
 
-@router.delete("/{task_id}")
+@router.delete("/{task_id}", dependencies=[Depends(limit_writes), Depends(query_budget(3))])
 async def delete_task(
     task_id: int,
     session: AsyncSession = Depends(get_session),
     current_user: dict = Depends(get_current_user)
 ) -> dict:
     """
-    Delete a task.
+    Delete a task with a single ownership-scoped DELETE ... RETURNING.
     
     Args:
         task_id: Task ID
@@ -199,20 +559,21 @@ async def delete_task(
         dict: Status message
     """
     try:
-        # Get user
-        user = await get_user_by_telegram_id(current_user["id"], session)
-        
-        # Get task
         result = await session.execute(
-            select(Task).where(Task.id == task_id, Task.user_id == user.id)
+            delete(Task)
+            .where(Task.id == task_id, *task_owner_filter(current_user))
+            .returning(Task.id, Task.user_id, Task.status, Task.priority)
         )
-        task = result.scalar_one_or_none()
+        row = result.one_or_none()
         
-        if not task:
+        if row is None:
             raise HTTPException(status_code=404, detail="Task not found")
         
-        await session.delete(task)
+        version = await apply_task_delta(
+            session, row.user_id, removed=[(row.status, row.priority)], deleted=[row.id]
+        )
         await session.commit()
+        await publish_task_event(row.user_id, version, deleted=[row.id])
         
         return {"status": "success", "message": "Task deleted"}
         
@@ -223,8 +584,384 @@ async def delete_task(
         raise HTTPException(status_code=500, detail="Error deleting task")
 
 
-@router.get("/stats", response_model=TaskStatsResponse)
+def id_array(ids: List[int]):
+    """
+    Bind a list of IDs as a single Postgres integer array for = ANY(...).
+    
+    Args:
+        ids: Task IDs
+        
+    Returns:
+        Bound array literal
+    """
+    return any_(literal(ids, ARRAY(Integer)))
+
+
+@router.post("/batch", response_model=TaskBatchResponse, dependencies=[Depends(limit_writes), Depends(query_budget(6))])
+async def batch_tasks(
+    batch: TaskBatchRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: dict = Depends(get_current_user)
+) -> TaskBatchResponse:
+    """
+    Apply a batch of create, update and delete operations in one transaction.
+    
+    Operations are grouped into set-based statements: one multi-row INSERT
+    for all creates, one UPDATE per distinct set of changes and one DELETE
+    for all deletes, applied in that order. Results are returned in request
+    order; operations on tasks the user doesn't own report "not_found".
+    A task can be updated and deleted at most once per batch (checked by
+    TaskBatchRequest), so each returned row is counted once.
+    
+    Args:
+        batch: Batch operations
+        session: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        TaskBatchResponse: Per-operation results
+    """
+    try:
+        # Get user
+        user_id = await get_current_user_id(current_user, session)
+        
+        operations = batch.operations
+        results: List[Optional[TaskBatchResult]] = [None] * len(operations)
+        removed, added = [], []
+        changed_ids, deleted_ids = [], []
+        
+        # Creates: one multi-row INSERT ... RETURNING in parameter order
+        creates = [(index, op) for index, op in enumerate(operations) if op.op == "create"]
+        if creates:
+            result = await session.execute(
+                insert(Task).returning(*TASK_COLUMNS, sort_by_parameter_order=True),
+                [
+                    {**op.task.model_dump(), "user_id": user_id, "status": TaskStatus.TODO}
+                    for _, op in creates
+                ],
+            )
+            for (index, op), row in zip(creates, result.all()):
+                added.append((row.status, row.priority))
+                changed_ids.append(row.id)
+                results[index] = TaskBatchResult(
+                    index=index, op=op.op, id=row.id, status="ok", task=TaskResponse.model_validate(row)
+                )
+        
+        # Updates: one UPDATE ... WHERE id = ANY(...) per distinct set of changes
+        update_groups: dict[tuple, List[tuple]] = {}
+        for index, op in enumerate(operations):
+            if op.op == "update":
+                changes = op.changes.model_dump(exclude_unset=True)
+                update_groups.setdefault(tuple(sorted(changes.items())), []).append((index, op))
+        
+        for changes, group in update_groups.items():
+            ids = [op.id for _, op in group]
+            owned = (
+                select(Task.id, Task.status, Task.priority)
+                .where(Task.id == id_array(ids), Task.user_id == user_id)
+            )
+            if changes:
+                old = owned.with_for_update().cte("old")
+                query = (
+                    update(Task)
+                    .where(Task.id == old.c.id)
+                    .values(**dict(changes))
+                    .returning(*TASK_COLUMNS, old.c.status.label("old_status"), old.c.priority.label("old_priority"))
+                )
+            else:
+                query = select(*TASK_COLUMNS).where(Task.id == id_array(ids), Task.user_id == user_id)
+            result = await session.execute(query)
+            
+            rows = {row.id: row for row in result.all()}
+            for index, op in group:
+                row = rows.get(op.id)
+                if row is None:
+                    results[index] = TaskBatchResult(index=index, op=op.op, id=op.id, status="not_found")
+                    continue
+                if changes:
+                    removed.append((row.old_status, row.old_priority))
+                    added.append((row.status, row.priority))
+                    changed_ids.append(row.id)
+                results[index] = TaskBatchResult(
+                    index=index, op=op.op, id=op.id, status="ok", task=TaskResponse.model_validate(row)
+                )
+        
+        # Deletes: one DELETE ... WHERE id = ANY(...)
+        deletes = [(index, op) for index, op in enumerate(operations) if op.op == "delete"]
+        if deletes:
+            result = await session.execute(
+                delete(Task)
+                .where(Task.id == id_array([op.id for _, op in deletes]), Task.user_id == user_id)
+                .returning(Task.id, Task.status, Task.priority)
+            )
+            deleted = {row.id: row for row in result.all()}
+            for index, op in deletes:
+                row = deleted.pop(op.id, None)
+                if row is not None:
+                    removed.append((row.status, row.priority))
+                    deleted_ids.append(row.id)
+                results[index] = TaskBatchResult(
+                    index=index, op=op.op, id=op.id, status="ok" if row is not None else "not_found"
+                )
+        
+        version = await apply_task_delta(
+            session, user_id, removed=removed, added=added, changed=changed_ids, deleted=deleted_ids
+        )
+        await session.commit()
+        await publish_task_event(user_id, version, changed=changed_ids, deleted=deleted_ids)
+        
+        return TaskBatchResponse(results=results)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error applying task batch: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error applying task batch")
+
+
+async def stream_task_export(
+    user_id: int,
+    export_format: str,
+    status: Optional[TaskStatus],
+    priority: Optional[TaskPriority],
+) -> AsyncIterator[str | bytes]:
+    """
+    Stream a user's tasks from a server-side cursor.
+    
+    Uses its own session: the endpoint closes the request session before
+    returning, so the request never holds two pooled connections.
+    
+    Args:
+        user_id: Internal user ID
+        export_format: "ndjson", "csv" or "msgpack"
+        status: Filter by status (optional)
+        priority: Filter by priority (optional)
+        
+    Yields:
+        str | bytes: Chunks of the export body
+    """
+    query = build_task_list_query(user_id, status, priority, columns=TASK_COLUMNS)
+    query = query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+    
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=TASK_FIELDS)
+        writer.writeheader()
+        yield buffer.getvalue()
+    
+    async with async_session_maker() as session:
+        result = await session.stream(query)
+        async for rows in result.partitions():
+            if export_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.DictWriter(buffer, fieldnames=TASK_FIELDS)
+                writer.writerows(task_row_to_dict(row) for row in rows)
+                yield buffer.getvalue()
+            elif export_format == "msgpack":
+                yield b"".join(packb(dict(zip(TASK_FIELDS, row))) for row in rows)
+            else:
+                yield "".join(json.dumps(task_row_to_dict(row)) + "\n" for row in rows)
+
+
+@router.get("/export", dependencies=[Depends(limit_exports), Depends(query_budget(2))])
+async def export_tasks(
+    export_format: Literal["ndjson", "csv", "msgpack"] | None = Query(None, alias="format"),
+    status: TaskStatus | None = None,
+    priority: TaskPriority | None = None,
+    accept: str | None = Header(None),
+    session: AsyncSession = Depends(get_session),
+    current_user: dict = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    Export user's tasks as NDJSON, CSV or a stream of MessagePack objects.
+    
+    Rows are streamed in batches, so memory use doesn't grow with the
+    number of tasks. Without a format, MessagePack is used when the Accept
+    header prefers it and NDJSON otherwise.
+    
+    Args:
+        export_format: "ndjson", "csv" or "msgpack" (optional)
+        status: Filter by status (optional)
+        priority: Filter by priority (optional)
+        accept: Accept header (optional)
+        session: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        StreamingResponse: Export body
+    """
+    try:
+        # Get user
+        user_id = await get_current_user_id(current_user, session)
+        
+        if export_format is None:
+            export_format = "msgpack" if prefers_msgpack(accept) else "ndjson"
+        media_type = EXPORT_MEDIA_TYPES[export_format]
+        
+        # The session dependency only exits after the body is streamed; give its connection back now
+        await session.close()
+        
+        return StreamingResponse(
+            stream_task_export(user_id, export_format, status, priority),
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="tasks.{export_format}"'},
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error exporting tasks: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error exporting tasks")
+
+
+async def load_task_changes(session: AsyncSession, user_id: int, since: int) -> TaskChangesResponse:
+    """
+    Query the changes returned by GET /api/tasks/changes.
+    
+    Args:
+        session: Database session
+        user_id: Internal user ID
+        since: Version returned by the previous sync
+        
+    Returns:
+        TaskChangesResponse: Changes up to the user's current version
+    """
+    # Read the version first so the changes are never older than it
+    counters = await get_task_counters(session, user_id)
+    version = counters.data_version
+    
+    if since < counters.changes_floor or since > version:
+        result = await session.execute(build_task_list_query(user_id, columns=TASK_COLUMNS))
+        return TaskChangesResponse(
+            version=version,
+            reset=True,
+            tasks=[TaskResponse.model_validate(row) for row in result.all()],
+            deleted=[],
+        )
+    
+    if since == version:
+        return TaskChangesResponse(version=version, tasks=[], deleted=[])
+    
+    window = (
+        TaskChange.user_id == user_id,
+        TaskChange.version > since,
+        TaskChange.version <= version,
+    )
+    result = await session.execute(
+        select(*TASK_COLUMNS)
+        .where(Task.user_id == user_id, Task.id.in_(select(TaskChange.task_id).where(*window)))
+        .order_by(Task.created_at.desc(), Task.id.desc())
+    )
+    tasks = [TaskResponse.model_validate(row) for row in result.all()]
+    
+    result = await session.execute(
+        select(TaskChange.task_id).where(*window, TaskChange.deleted).distinct()
+    )
+    deleted = result.scalars().all()
+    
+    return TaskChangesResponse(version=version, tasks=tasks, deleted=deleted)
+
+
+@router.get("/changes", response_model=TaskChangesResponse, dependencies=[Depends(limit_reads), Depends(query_budget(4))])
+async def get_task_changes(
+    since: int = Query(0, ge=0),
+    session: AsyncSession = Depends(get_session),
+    current_user: dict = Depends(get_current_user)
+) -> TaskChangesResponse:
+    """
+    Get tasks created or updated, and IDs of tasks deleted, since a sync version.
+    
+    Pass the returned version as since on the next call. When since is
+    older than the compacted change log (or not a version this server
+    issued), the response has reset set and holds every task; the client
+    should replace its copy instead of merging.
+    
+    Args:
+        since: Version returned by the previous sync (0 for a first sync)
+        session: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        TaskChangesResponse: Changes up to the returned version
+    """
+    try:
+        # Get user
+        user_id = await get_current_user_id(current_user, session)
+        
+        return await load_task_changes(session, user_id, since)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting task changes: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Error fetching task changes")
+
+
+@router.websocket("/events")
+async def task_events(websocket: WebSocket) -> None:
+    """
+    Push task change events to the Mini App.
+    
+    Browsers can't set headers on WebSocket requests, and URLs end up in
+    access logs, so the client sends the session token from
+    POST /api/auth/session as its first message: {"type": "auth", "token": ...}.
+    Without a valid one within TASK_EVENTS_AUTH_TIMEOUT seconds the
+    connection is closed with 1008. Each event carries the user's new data
+    version; the client catches up with GET /api/tasks/changes. A ping is
+    sent when idle so proxies keep the connection open, and a client that
+    can't keep up is disconnected.
+    
+    Args:
+        websocket: WebSocket connection
+    """
+    await websocket.accept()
+    
+    try:
+        message = await asyncio.wait_for(websocket.receive_json(), timeout=config.task_events_auth_timeout)
+        user_id = verify_session_token(message["token"])["user_id"]
+    except WebSocketDisconnect:
+        return
+    except (asyncio.TimeoutError, HTTPException, ValueError, KeyError, TypeError):
+        await websocket.close(code=1008)
+        return
+    
+    # Nothing is expected from the client; reading only detects disconnects
+    async def wait_disconnect() -> None:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    
+    disconnected = asyncio.create_task(wait_disconnect())
+    try:
+        async with task_event_hub.subscribe(user_id) as queue:
+            while not disconnected.done():
+                next_event = asyncio.create_task(queue.get())
+                done, _ = await asyncio.wait(
+                    (next_event, disconnected),
+                    timeout=config.task_events_heartbeat,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if next_event in done:
+                    event = next_event.result()
+                elif disconnected in done:
+                    next_event.cancel()
+                    break
+                else:
+                    next_event.cancel()
+                    event = {"type": "ping"}
+                await asyncio.wait_for(websocket.send_json(event), timeout=config.task_events_send_timeout)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    except asyncio.TimeoutError:
+        logger.info(f"Closing task events for user {user_id}: client too slow")
+        await websocket.close(code=1013)
+    finally:
+        disconnected.cancel()
+
+
+@router.get("/stats", response_model=TaskStatsResponse, dependencies=[Depends(limit_reads), Depends(query_budget(2))])
 async def get_task_stats(
+    response: Response,
+    if_none_match: str | None = Header(None),
     session: AsyncSession = Depends(get_session),
     current_user: dict = Depends(get_current_user)
 ) -> TaskStatsResponse:
@@ -232,6 +969,8 @@ async def get_task_stats(
     Get user's task statistics.
     
     Args:
+        response: Outgoing response
+        if_none_match: ETag of the client's cached copy (optional)
         session: Database session
         current_user: Current authenticated user
         
@@ -240,30 +979,25 @@ async def get_task_stats(
     """
     try:
         # Get user
-        user = await get_user_by_telegram_id(current_user["id"], session)
+        user_id = await get_current_user_id(current_user, session)
         
         # Get statistics
-        result = await session.execute(
-            select(
-                func.count(Task.id).label("total"),
-                func.sum(case((Task.status == TaskStatus.TODO, 1), else_=0)).label("todo"),
-                func.sum(case((Task.status == TaskStatus.IN_PROGRESS, 1), else_=0)).label("in_progress"),
-                func.sum(case((Task.status == TaskStatus.DONE, 1), else_=0)).label("done"),
-                func.sum(case((Task.priority == TaskPriority.HIGH, 1), else_=0)).label("high_priority"),
-                func.sum(case((Task.priority == TaskPriority.MEDIUM, 1), else_=0)).label("medium_priority"),
-                func.sum(case((Task.priority == TaskPriority.LOW, 1), else_=0)).label("low_priority"),
-            ).where(Task.user_id == user.id)
-        )
-        stats = result.one()
+        counters = await get_task_counters(session, user_id)
+        
+        etag = task_etag(user_id, counters.data_version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, no-cache"
         
         return TaskStatsResponse(
-            total=stats.total or 0,
-            todo=stats.todo or 0,
-            in_progress=stats.in_progress or 0,
-            done=stats.done or 0,
-            high_priority=stats.high_priority or 0,
-            medium_priority=stats.medium_priority or 0,
-            low_priority=stats.low_priority or 0,
+            total=counters.total,
+            todo=counters.todo,
+            in_progress=counters.in_progress,
+            done=counters.done,
+            high_priority=counters.high_priority,
+            medium_priority=counters.medium_priority,
+            low_priority=counters.low_priority,
         )
         
     except HTTPException:
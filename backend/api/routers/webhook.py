@@ -1,33 +1,18 @@
 """Webhook router for handling Telegram updates."""
 import logging
 
-from aiogram import Bot, Dispatcher
-from aiogram.client.default import DefaultBotProperties
-from aiogram.enums import ParseMode
 from aiogram.types import Update
 from fastapi import APIRouter, Request
 
 from api.config import config
-from bot.handlers import start, tasks
-from bot.middlewares import DatabaseMiddleware
+from bot.dispatcher import create_bot, create_dispatcher
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 # Initialize bot and dispatcher (shared instance)
-bot = Bot(
-    token=config.bot_token,
-    default=DefaultBotProperties(parse_mode=ParseMode.HTML)
-)
-dp = Dispatcher()
-
-# Register middlewares
-dp.message.middleware(DatabaseMiddleware())
-dp.callback_query.middleware(DatabaseMiddleware())
-
-# Register routers
-dp.include_router(start.router)
-dp.include_router(tasks.router)
+bot = create_bot(config.bot_token)
+dp = create_dispatcher()
 
 
 @router.post("/webhook")
@@ -46,7 +31,7 @@ async def webhook_handler(request: Request) -> dict:
         update_dict = await request.json()
         update = Update(**update_dict)
         
-        # Feed update to dispatcher
+        # Feed update to dispatcher (its spans are children of this request's span)
         await dp.feed_update(bot=bot, update=update)
         
         return {"status": "ok"}
@@ -0,0 +1,47 @@
+"""Request tracing for the API."""
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from shared.tracing import parse_traceparent, tracer
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware running each HTTP request in a server span.
+    
+    The span continues the trace of an incoming traceparent header and is
+    named after the route template once the request was routed. Spans of
+    work done within the request (statements, webhook updates) are its
+    children.
+    """
+    
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Initialize middleware.
+        
+        Args:
+            app: ASGI application
+        """
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        parent = parse_traceparent(Headers(scope=scope).get("traceparent"))
+        attributes = {"http.method": scope["method"], "http.target": scope["path"]}
+        with tracer.span(f"{scope['method']} {scope['path']}", "server", attributes, parent) as span:
+            
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                await send(message)
+            
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.name = f"{scope['method']} {route.path}"
+                    span.set_attribute("http.route", route.path)
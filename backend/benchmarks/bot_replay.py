@@ -0,0 +1,570 @@
+"""Bot throughput benchmark replaying synthetic updates.
+
+Feeds Telegram updates (/start, /mytasks, the menu buttons, task action
+callbacks and the /addtask conversation) to a dispatcher built by
+bot.dispatcher.create_dispatcher, the same wiring as polling and the
+webhook. Bot API calls go to a stub session that records them instead
+of reaching Telegram, so the run only needs the database (and Redis, if
+configured). Reports updates per second and, per handler, latency
+percentiles, database statements and Bot API calls per update.
+
+Each user's updates are fed in order, as Telegram delivers them per chat;
+--concurrency users are replayed at once.
+
+Run from backend/ with the bot environment loaded (e.g. inside the bot
+container):
+
+    python -m benchmarks.bot_replay --users 50 --rounds 20 --concurrency 10
+    python -m benchmarks.bot_replay --save-corpus updates.jsonl
+    python -m benchmarks.bot_replay --corpus updates.jsonl --compare benchmarks/results/bot-<before>.json
+
+The synthetic users (Telegram IDs from --first-telegram-id up) are
+deleted and recreated with --tasks-per-user tasks on every run. A saved
+corpus refers to tasks by their position in each user's list, so replay it
+with the --tasks-per-user it was recorded with.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware, Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import CallbackQuery, Chat, Message, TelegramObject, Update, User as TelegramUser
+from sqlalchemy import delete, select
+
+from benchmarks.common import RESULTS_DIR, TITLES, git_commit, percentile
+from bot.config import config
+from bot.dispatcher import create_bot, create_dispatcher
+from database import async_session_maker, close_db, init_db
+from database.models import Task, User
+from shared.metrics import instrument_database
+from shared.query_stats import instrument_queries, track_queries
+from shared.redis_client import close_redis, init_redis
+from shared.tracing import trace_database
+from shared.user_resolver import user_resolver
+
+# Any well-formed token; nothing is sent to Telegram
+REPLAY_BOT_TOKEN = "123456:replay"
+
+# Weights of the actions making up each round of a user's updates
+ACTIONS = {
+    "start": 5,
+    "mytasks": 15,
+    "menu_tasks": 20,
+    "menu_stats": 15,
+    "help": 5,
+    "addtask": 10,
+    "task_action": 25,
+    "task_delete": 5,
+}
+
+# Label of updates no handler took (e.g. dropped by the rate limiter)
+UNHANDLED = "<unhandled>"
+
+
+class UpdateRecord:
+    """What happened while one update was handled."""
+    
+    def __init__(self) -> None:
+        self.handler = UNHANDLED
+        self.api_calls = 0
+
+
+_record: ContextVar[Optional[UpdateRecord]] = ContextVar("replay_record", default=None)
+
+
+class RecordingSession(BaseSession):
+    """Bot session answering Bot API calls locally and counting them."""
+    
+    def __init__(self, latency: float = 0.0) -> None:
+        """
+        Initialize session.
+        
+        Args:
+            latency: Seconds each call takes, to mimic the round trip to Telegram
+        """
+        super().__init__()
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self._message_ids = itertools.count(1_000_000)
+    
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod[TelegramType], timeout: Optional[int] = None
+    ) -> TelegramType:
+        self.calls[type(method).__name__] += 1
+        record = _record.get()
+        if record is not None:
+            record.api_calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        
+        returning = method.__returning__
+        if returning is Message or Message in getattr(returning, "__args__", ()):
+            chat_id = getattr(method, "chat_id", None) or 0
+            return Message(
+                message_id=getattr(method, "message_id", None) or next(self._message_ids),
+                date=datetime.now(timezone.utc),
+                chat=Chat(id=chat_id, type="private"),
+                text=getattr(method, "text", None),
+            )
+        return True
+    
+    async def stream_content(self, *args: Any, **kwargs: Any) -> AsyncGenerator[bytes, None]:
+        raise NotImplementedError("The replay session does not download files")
+        yield b""
+    
+    async def close(self) -> None:
+        pass
+
+
+class HandlerRecorderMiddleware(BaseMiddleware):
+    """Innermost middleware noting which handler took the update."""
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        record = _record.get()
+        if record is not None:
+            callback = data["handler"].callback
+            record.handler = f"{callback.__module__.rsplit('.', 1)[-1]}.{callback.__name__}"
+        return await handler(event, data)
+
+
+class UpdateFactory:
+    """Builds private-chat updates with increasing IDs."""
+    
+    def __init__(self) -> None:
+        self._ids = itertools.count(1)
+    
+    def message(self, telegram_id: int, text: str) -> Update:
+        """Build a text message update."""
+        user = TelegramUser(id=telegram_id, is_bot=False, first_name=f"Replay {telegram_id}")
+        return Update(
+            update_id=next(self._ids),
+            message=Message(
+                message_id=next(self._ids),
+                date=datetime.now(timezone.utc),
+                chat=Chat(id=telegram_id, type="private"),
+                from_user=user,
+                text=text,
+            ),
+        )
+    
+    def callback(self, telegram_id: int, data: str) -> Update:
+        """Build a callback query update from a button under a bot message."""
+        user = TelegramUser(id=telegram_id, is_bot=False, first_name=f"Replay {telegram_id}")
+        return Update(
+            update_id=next(self._ids),
+            callback_query=CallbackQuery(
+                id=str(next(self._ids)),
+                from_user=user,
+                chat_instance=str(telegram_id),
+                data=data,
+                message=Message(
+                    message_id=next(self._ids),
+                    date=datetime.now(timezone.utc),
+                    chat=Chat(id=telegram_id, type="private"),
+                    text="Task",
+                ),
+            ),
+        )
+
+
+def action_updates(
+    factory: UpdateFactory, telegram_id: int, action: str, task_ids: list[int], rng: random.Random
+) -> list[Update]:
+    """
+    Build the updates a user sends for one action.
+    
+    Args:
+        factory: Update factory
+        telegram_id: Telegram user ID
+        action: Key of ACTIONS
+        task_ids: IDs of the user's tasks (deleted ones are removed)
+        rng: Random generator
+        
+    Returns:
+        list[Update]: Updates in the order the user sends them
+    """
+    if action == "start":
+        return [factory.message(telegram_id, "/start")]
+    if action == "mytasks":
+        return [factory.message(telegram_id, "/mytasks")]
+    if action == "menu_tasks":
+        return [factory.message(telegram_id, "📋 Мои задачи")]
+    if action == "menu_stats":
+        return [factory.message(telegram_id, "📊 Статистика")]
+    if action == "help":
+        return [factory.message(telegram_id, "ℹ️ Помощь")]
+    if action == "addtask":
+        return [factory.message(telegram_id, "/addtask"), factory.message(telegram_id, rng.choice(TITLES))]
+    if not task_ids:
+        return [factory.message(telegram_id, "/mytasks")]
+    if action == "task_delete":
+        return [factory.callback(telegram_id, f"task_delete:{task_ids.pop(rng.randrange(len(task_ids)))}")]
+    verb = rng.choice(["task_done", "task_progress", "task_todo"])
+    return [factory.callback(telegram_id, f"{verb}:{rng.choice(task_ids)}")]
+
+
+def build_corpus(
+    factory: UpdateFactory, task_ids: dict[int, list[int]], rounds: int, rng: random.Random
+) -> list[Update]:
+    """
+    Build the measured updates of every user.
+    
+    Args:
+        factory: Update factory
+        task_ids: Task IDs by Telegram user ID
+        rounds: Actions per user
+        rng: Random generator
+        
+    Returns:
+        list[Update]: Updates, each user's in order
+    """
+    actions, weights = zip(*ACTIONS.items())
+    updates = []
+    for telegram_id, ids in task_ids.items():
+        ids = list(ids)
+        for action in rng.choices(actions, weights=weights, k=rounds):
+            updates.extend(action_updates(factory, telegram_id, action, ids, rng))
+    return updates
+
+
+def sender(update: Update) -> int:
+    """Get the Telegram ID of the user who sent an update."""
+    event = update.message or update.callback_query
+    return event.from_user.id
+
+
+class BotReplay:
+    """Replays updates through the dispatcher and records what each cost."""
+    
+    def __init__(self, dp: Dispatcher, bot: Bot, concurrency: int) -> None:
+        """
+        Initialize replay.
+        
+        Args:
+            dp: Dispatcher to feed updates to
+            bot: Bot with a RecordingSession
+            concurrency: Users replayed at once
+        """
+        self.dp = dp
+        self.bot = bot
+        self.concurrency = concurrency
+        self.durations: dict[str, list[float]] = defaultdict(list)
+        self.statements: Counter[str] = Counter()
+        self.api_calls: Counter[str] = Counter()
+    
+    async def feed(self, update: Update, measure: bool = True) -> None:
+        """Handle one update, recording its handler, latency, statements and Bot API calls."""
+        record = UpdateRecord()
+        token = _record.set(record)
+        try:
+            with track_queries(f"replay update {update.update_id}") as stats:
+                started = time.perf_counter()
+                await self.dp.feed_update(self.bot, update)
+                duration = time.perf_counter() - started
+        finally:
+            _record.reset(token)
+        
+        if measure:
+            self.durations[record.handler].append(duration)
+            self.statements[record.handler] += stats.statements
+            self.api_calls[record.handler] += record.api_calls
+    
+    async def replay(self, updates: list[Update], measure: bool = True) -> float:
+        """
+        Feed updates, each user's in order and several users at once.
+        
+        Args:
+            updates: Updates to feed
+            measure: Whether to record the updates
+            
+        Returns:
+            float: Seconds taken
+        """
+        streams: dict[int, list[Update]] = defaultdict(list)
+        for update in updates:
+            streams[sender(update)].append(update)
+        pending = iter(streams.values())
+        
+        async def worker() -> None:
+            for stream in pending:
+                for update in stream:
+                    await self.feed(update, measure)
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return time.perf_counter() - started
+    
+    def summary(self, elapsed: float) -> dict:
+        """
+        Summarize the recorded updates.
+        
+        Args:
+            elapsed: Seconds the measured replay took
+            
+        Returns:
+            dict: Totals and per-handler latency percentiles, statements and Bot API calls
+        """
+        handlers = {}
+        for name, durations in sorted(self.durations.items()):
+            durations = sorted(durations)
+            handlers[name] = {
+                "updates": len(durations),
+                "mean_ms": round(sum(durations) / len(durations) * 1000, 3),
+                "p50_ms": round(percentile(durations, 0.50) * 1000, 3),
+                "p95_ms": round(percentile(durations, 0.95) * 1000, 3),
+                "p99_ms": round(percentile(durations, 0.99) * 1000, 3),
+                "max_ms": round(durations[-1] * 1000, 3),
+                "statements_per_update": round(self.statements[name] / len(durations), 2),
+                "api_calls_per_update": round(self.api_calls[name] / len(durations), 2),
+            }
+        
+        everything = sorted(duration for durations in self.durations.values() for duration in durations)
+        updates = len(everything)
+        return {
+            "updates": updates,
+            "updates_per_second": round(updates / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(everything, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(everything, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(everything, 0.99) * 1000, 3),
+            "statements_per_update": round(sum(self.statements.values()) / updates, 2) if updates else 0.0,
+            "api_calls_per_update": round(sum(self.api_calls.values()) / updates, 2) if updates else 0.0,
+            "handlers": handlers,
+        }
+
+
+async def reset_users(telegram_ids: list[int]) -> None:
+    """Delete the synthetic users with their tasks, so /start recreates them."""
+    async with async_session_maker() as session:
+        await session.execute(delete(User).where(User.telegram_id.in_(telegram_ids)))
+        await session.commit()
+    for telegram_id in telegram_ids:
+        await user_resolver.invalidate(telegram_id)
+
+
+async def load_task_ids(telegram_ids: list[int]) -> dict[int, list[int]]:
+    """Get the IDs of the synthetic users' tasks."""
+    task_ids = {telegram_id: [] for telegram_id in telegram_ids}
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(User.telegram_id, Task.id)
+            .join(Task, Task.user_id == User.id)
+            .where(User.telegram_id.in_(telegram_ids))
+            .order_by(Task.id)
+        )
+        for telegram_id, task_id in result:
+            task_ids[telegram_id].append(task_id)
+    return task_ids
+
+
+def with_task_refs(updates: list[Update], task_ids: dict[int, list[int]], positions: bool) -> list[Update]:
+    """
+    Swap task IDs in callback data for positions in the sender's task list, or back.
+    
+    Saved corpora refer to tasks by position ("task_done:#3"), so they
+    replay against the tasks of any run with the same --tasks-per-user.
+    
+    Args:
+        updates: Updates to rewrite
+        task_ids: Task IDs by Telegram user ID, in creation order
+        positions: True to turn IDs into positions, False for the reverse
+        
+    Returns:
+        list[Update]: Rewritten updates (positions without a task become ID 0, which is never found)
+    """
+    rewritten = []
+    for update in updates:
+        callback = update.callback_query
+        if callback is not None and callback.data and callback.data.startswith("task_"):
+            verb, ref = callback.data.split(":")
+            ids = task_ids.get(sender(update), [])
+            if positions:
+                ref = f"#{ids.index(int(ref))}" if int(ref) in ids else ref
+            elif ref.startswith("#"):
+                position = int(ref[1:])
+                ref = str(ids[position]) if position < len(ids) else "0"
+            callback = callback.model_copy(update={"data": f"{verb}:{ref}"})
+            update = update.model_copy(update={"callback_query": callback})
+        rewritten.append(update)
+    return rewritten
+
+
+def save_corpus(path: str, updates: list[Update]) -> None:
+    """Write updates as JSON lines."""
+    with open(path, "w") as file:
+        for update in updates:
+            file.write(update.model_dump_json(exclude_none=True) + "\n")
+
+
+def load_corpus(path: str) -> list[Update]:
+    """Read updates written by save_corpus."""
+    with open(path) as file:
+        return [Update.model_validate_json(line) for line in file if line.strip()]
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """
+    Set up the users, replay the corpus and summarize it.
+    
+    Args:
+        args: Command line arguments
+        
+    Returns:
+        dict: Results with the run configuration
+    """
+    instrument_database()
+    instrument_queries()
+    trace_database()
+    await init_db()
+    if not args.no_redis:
+        init_redis(config.redis_url)
+    
+    session = RecordingSession(latency=args.api_latency / 1000)
+    bot = create_bot(REPLAY_BOT_TOKEN, session=session)
+    rate_limits = ("0", "0") if not args.rate_limits else (config.rate_limit_message, config.rate_limit_callback_query)
+    dp = create_dispatcher(*rate_limits)
+    dp.message.middleware(HandlerRecorderMiddleware())
+    dp.callback_query.middleware(HandlerRecorderMiddleware())
+    
+    rng = random.Random(args.seed)
+    factory = UpdateFactory()
+    replay = BotReplay(dp, bot, args.concurrency)
+    
+    try:
+        # A saved corpus brings its own users
+        corpus = load_corpus(args.corpus) if args.corpus else None
+        if corpus is not None:
+            telegram_ids = sorted({sender(update) for update in corpus})
+        else:
+            telegram_ids = [args.first_telegram_id + i for i in range(args.users)]
+        
+        # Users and their first tasks come from the same handlers, unmeasured
+        await reset_users(telegram_ids)
+        setup = []
+        for telegram_id in telegram_ids:
+            setup.append(factory.message(telegram_id, "/start"))
+            for _ in range(args.tasks_per_user):
+                setup.extend(action_updates(factory, telegram_id, "addtask", [], rng))
+        started = time.perf_counter()
+        await replay.replay(setup, measure=False)
+        print(
+            f"Set up {len(telegram_ids)} users with {args.tasks_per_user} tasks each "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        
+        task_ids = await load_task_ids(telegram_ids)
+        if corpus is not None:
+            updates = with_task_refs(corpus, task_ids, positions=False)
+        else:
+            updates = build_corpus(factory, task_ids, args.rounds, rng)
+        if args.save_corpus:
+            save_corpus(args.save_corpus, with_task_refs(updates, task_ids, positions=True))
+            print(f"Corpus saved to {args.save_corpus}")
+        
+        session.calls.clear()
+        print(f"Replaying {len(updates)} updates from {args.concurrency} users at a time...")
+        elapsed = await replay.replay(updates)
+    finally:
+        await bot.session.close()
+        await close_redis()
+        await close_db()
+    
+    return {
+        "label": args.label,
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            key: getattr(args, key)
+            for key in ("users", "tasks_per_user", "rounds", "concurrency", "api_latency", "rate_limits", "corpus", "seed")
+        },
+        "elapsed_s": round(elapsed, 3),
+        "results": replay.summary(elapsed),
+        "api_calls": dict(session.calls),
+    }
+
+
+def print_results(results: dict, baseline: Optional[dict] = None) -> None:
+    """
+    Print a results table, with changes against a baseline run if given.
+    
+    Args:
+        results: Results of this run
+        baseline: Results of an earlier run
+    """
+    summary = results["results"]
+    base_handlers = baseline["results"]["handlers"] if baseline else {}
+    
+    def change(base: Optional[float], value: float) -> str:
+        return f" ({(value - base) / base * 100:+.0f}%)" if base else ""
+    
+    base_rate = baseline["results"]["updates_per_second"] if baseline else None
+    print(
+        f"{summary['updates']} updates, {summary['updates_per_second']:.1f}/s{change(base_rate, summary['updates_per_second'])}, "
+        f"{summary['statements_per_update']} statements and {summary['api_calls_per_update']} Bot API calls per update"
+    )
+    print(f"{'handler':<28} {'updates':>8} {'p50 ms':>14} {'p95 ms':>14} {'p99 ms':>14} {'stmts':>6} {'api':>5}")
+    for name, row in summary["handlers"].items():
+        base = base_handlers.get(name, {})
+        cells = [f"{row[key]:.2f}{change(base.get(key), row[key])}" for key in ("p50_ms", "p95_ms", "p99_ms")]
+        print(
+            f"{name:<28} {row['updates']:>8} " + " ".join(f"{cell:>14}" for cell in cells)
+            + f" {row['statements_per_update']:>6} {row['api_calls_per_update']:>5}"
+        )
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Replay synthetic updates through the bot's dispatcher")
+    parser.add_argument("--users", type=int, default=20, help="synthetic users")
+    parser.add_argument("--tasks-per-user", type=int, default=10, help="tasks each user adds before the replay")
+    parser.add_argument("--rounds", type=int, default=20, help="actions per user in the replay")
+    parser.add_argument("--concurrency", type=int, default=10, help="users replayed at once")
+    parser.add_argument("--api-latency", type=float, default=0, help="milliseconds each stubbed Bot API call takes")
+    parser.add_argument("--rate-limits", action="store_true", help="keep the configured per-user rate limits")
+    parser.add_argument("--no-redis", action="store_true", help="run with in-process caches only")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the corpus")
+    parser.add_argument("--first-telegram-id", type=int, default=9_100_000_000, help="Telegram ID of the first user")
+    parser.add_argument("--corpus", help="replay updates from this JSONL file instead of generating them")
+    parser.add_argument("--save-corpus", help="write the replayed updates to this JSONL file")
+    parser.add_argument("--label", default="", help="free-form name stored with the results")
+    parser.add_argument("--output", help="results file (default benchmarks/results/bot-<commit>-<time>.json)")
+    parser.add_argument("--compare", help="results file of an earlier run to compare against")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run(args))
+    
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print_results(results, baseline)
+    
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"bot-{results['commit'] or 'unknown'}-{stamp}.json")
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Helpers shared by the benchmarks.
+
+Kept free of API and bot imports: importing api.routers builds the
+webhook dispatcher, and the bot replay needs to build its own.
+"""
+import math
+import os
+import subprocess
+from typing import Optional
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+TITLES = [
+    "Купить продукты",
+    "Позвонить маме",
+    "Подготовить отчёт за квартал",
+    "Review pull request",
+    "Оплатить интернет",
+    "Записаться к врачу",
+    "Fix login bug on Android",
+    "Прочитать главу книги",
+]
+
+DESCRIPTIONS = [
+    None,
+    None,
+    "Молоко, хлеб, яйца, сыр",
+    "Обсудить планы на выходные и уточнить время",
+    "Collect numbers from the finance dashboard and summarize the main changes since last quarter.",
+]
+
+
+def percentile(durations: list[float], share: float) -> float:
+    """
+    Get a nearest-rank percentile.
+    
+    Args:
+        durations: Sorted durations
+        share: Percentile as a fraction (0.95 for p95)
+        
+    Returns:
+        float: Duration at the percentile (0 without samples)
+    """
+    if not durations:
+        return 0.0
+    return durations[max(0, math.ceil(share * len(durations)) - 1)]
+
+
+def git_commit() -> Optional[str]:
+    """Get the commit being benchmarked, if run from a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
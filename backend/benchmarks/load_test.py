@@ -0,0 +1,475 @@
+"""HTTP load test for the tasks API.
+
+Creates synthetic users in the database, seeds them with realistic task
+lists through the API, then drives list, create, update, delete and
+statistics requests from concurrent clients for a fixed time. Reports
+throughput and p50/p95/p99 latency per operation and saves the results
+as JSON, so runs on different commits can be compared.
+
+Run from backend/ against a running API (Postgres required), with the
+same BOT_TOKEN and DATABASE_URL as the API, e.g. inside the api
+container. Disable rate limits on the API for the run
+(RATE_LIMIT_READ=0 RATE_LIMIT_WRITE=0), or 429s will dominate:
+
+    python -m benchmarks.load_test --users 50 --concurrency 20 --duration 30
+    python -m benchmarks.load_test --mix list=60,stats=20,create=10,update=8,delete=2
+    python -m benchmarks.load_test --compare benchmarks/results/load-<before>.json
+
+Users get Telegram IDs from --first-telegram-id up, far above real ones.
+Their tasks are replaced on every run unless --no-seed is given.
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import math
+import os
+import random
+import time
+import urllib.parse
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import aiohttp
+from sqlalchemy.dialects.postgresql import insert
+
+from api.auth import SECRET_KEY
+from benchmarks.common import DESCRIPTIONS, RESULTS_DIR, TITLES, git_commit, percentile
+from database import async_session_maker, close_db
+from database.models import TaskPriority, TaskStatus, User
+
+OPERATIONS = ("list", "stats", "create", "update", "delete")
+
+# Operations in the batches used to seed and reset task lists (the API maximum)
+BATCH_SIZE = 500
+
+STATUS_WEIGHTS = {TaskStatus.TODO: 0.45, TaskStatus.IN_PROGRESS: 0.2, TaskStatus.DONE: 0.35}
+PRIORITY_WEIGHTS = {TaskPriority.LOW: 0.3, TaskPriority.MEDIUM: 0.5, TaskPriority.HIGH: 0.2}
+
+
+def sign_init_data(telegram_id: int, secret_key: bytes = SECRET_KEY) -> str:
+    """
+    Build Web App initData for a user, signed like Telegram does.
+    
+    Args:
+        telegram_id: Telegram user ID
+        secret_key: Key derived from the bot token
+        
+    Returns:
+        str: URL-encoded initData
+    """
+    fields = {
+        "auth_date": str(int(time.time())),
+        "query_id": f"bench{telegram_id}",
+        "user": json.dumps({"id": telegram_id, "first_name": f"Bench {telegram_id}"}, separators=(",", ":")),
+    }
+    data_check_string = "\n".join(f"{key}={value}" for key, value in sorted(fields.items()))
+    fields["hash"] = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return urllib.parse.urlencode(fields)
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """
+    Parse an operation mix such as "list=50,stats=20,create=10".
+    
+    Args:
+        spec: Comma-separated operation=weight pairs
+        
+    Returns:
+        dict[str, float]: Weight per operation
+        
+    Raises:
+        ValueError: If an operation is unknown or no weight is positive
+    """
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name!r} (expected one of {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("The mix needs at least one operation with a positive weight")
+    return mix
+
+
+def make_task(rng: random.Random) -> dict:
+    """
+    Build a TaskCreate body.
+    
+    Args:
+        rng: Random generator
+        
+    Returns:
+        dict: Task fields
+    """
+    deadline = None
+    if rng.random() < 0.4:
+        deadline = (datetime.now(timezone.utc) + timedelta(days=rng.randrange(-5, 30))).isoformat()
+    return {
+        "title": rng.choice(TITLES),
+        "description": rng.choice(DESCRIPTIONS),
+        "priority": rng.choices(list(PRIORITY_WEIGHTS), weights=list(PRIORITY_WEIGHTS.values()))[0].value,
+        "deadline": deadline,
+    }
+
+
+def task_counts(users: int, mean: int, rng: random.Random) -> list[int]:
+    """
+    Draw how many tasks each user has.
+    
+    Sizes are log-normal: most users have a few dozen tasks, a few have
+    hundreds.
+    
+    Args:
+        users: Number of users
+        mean: Average number of tasks per user
+        rng: Random generator
+        
+    Returns:
+        list[int]: Task count per user
+    """
+    if mean <= 0:
+        return [0] * users
+    sigma = 0.8
+    mu = math.log(mean) - sigma ** 2 / 2
+    return [min(int(rng.lognormvariate(mu, sigma)), 20 * mean) for _ in range(users)]
+
+
+class LoadTest:
+    """Synthetic users, their task IDs and the latencies recorded for them."""
+    
+    def __init__(self, args: argparse.Namespace) -> None:
+        """
+        Initialize load test.
+        
+        Args:
+            args: Command line arguments
+        """
+        self.args = args
+        self.url = args.url.rstrip("/")
+        self.rng = random.Random(args.seed)
+        self.telegram_ids = [args.first_telegram_id + i for i in range(args.users)]
+        self.auth: dict[int, str] = {}
+        self.task_ids: dict[int, list[int]] = {}
+        self.durations: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, Counter] = defaultdict(Counter)
+        self.mix = parse_mix(args.mix)
+        self.recording = False
+    
+    async def create_users(self) -> None:
+        """Insert the synthetic users into the database if missing."""
+        async with async_session_maker() as session:
+            await session.execute(
+                insert(User)
+                .values([
+                    {"telegram_id": telegram_id, "first_name": f"Bench {telegram_id}"}
+                    for telegram_id in self.telegram_ids
+                ])
+                .on_conflict_do_nothing(index_elements=[User.telegram_id])
+            )
+            await session.commit()
+        await close_db()
+    
+    async def authenticate(self, http: aiohttp.ClientSession) -> None:
+        """Get the Authorization header of every user."""
+        for telegram_id in self.telegram_ids:
+            init_data = sign_init_data(telegram_id)
+            if self.args.auth == "init-data":
+                self.auth[telegram_id] = init_data
+                continue
+            async with http.post(f"{self.url}/api/auth/session", headers={"Authorization": init_data}) as response:
+                response.raise_for_status()
+                self.auth[telegram_id] = f"Bearer {(await response.json())['token']}"
+    
+    async def batch(self, http: aiohttp.ClientSession, telegram_id: int, operations: list[dict]) -> list[dict]:
+        """Apply task operations in batches of the API maximum."""
+        results = []
+        for start in range(0, len(operations), BATCH_SIZE):
+            async with http.post(
+                f"{self.url}/api/tasks/batch",
+                json={"operations": operations[start:start + BATCH_SIZE]},
+                headers={"Authorization": self.auth[telegram_id]},
+            ) as response:
+                response.raise_for_status()
+                results.extend((await response.json())["results"])
+        return results
+    
+    async def existing_task_ids(self, http: aiohttp.ClientSession, telegram_id: int) -> list[int]:
+        """Get the IDs of a user's tasks."""
+        async with http.get(
+            f"{self.url}/api/tasks/export?format=ndjson", headers={"Authorization": self.auth[telegram_id]}
+        ) as response:
+            response.raise_for_status()
+            return [json.loads(line)["id"] for line in (await response.text()).splitlines() if line]
+    
+    async def seed(self, http: aiohttp.ClientSession) -> int:
+        """
+        Replace every user's tasks with a fresh random task list.
+        
+        Returns:
+            int: Number of tasks created
+        """
+        counts = task_counts(len(self.telegram_ids), self.args.tasks_per_user, self.rng)
+        
+        async def seed_user(telegram_id: int, count: int, rng: random.Random) -> None:
+            old_ids = await self.existing_task_ids(http, telegram_id)
+            await self.batch(http, telegram_id, [{"op": "delete", "id": task_id} for task_id in old_ids])
+            
+            created = await self.batch(
+                http, telegram_id, [{"op": "create", "task": make_task(rng)} for _ in range(count)]
+            )
+            ids = [result["id"] for result in created]
+            statuses = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()), k=len(ids))
+            await self.batch(http, telegram_id, [
+                {"op": "update", "id": task_id, "changes": {"status": status.value}}
+                for task_id, status in zip(ids, statuses)
+                if status != TaskStatus.TODO
+            ])
+            self.task_ids[telegram_id] = ids
+        
+        # Per-user generators keep the data independent of completion order
+        seeds = [self.rng.random() for _ in self.telegram_ids]
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+        
+        async def bounded(telegram_id: int, count: int, seed: float) -> None:
+            async with semaphore:
+                await seed_user(telegram_id, count, random.Random(seed))
+        
+        await asyncio.gather(*(
+            bounded(telegram_id, count, seed) for telegram_id, count, seed in zip(self.telegram_ids, counts, seeds)
+        ))
+        return sum(counts)
+    
+    async def load_task_ids(self, http: aiohttp.ClientSession) -> None:
+        """Get the task IDs of users seeded by an earlier run."""
+        for telegram_id in self.telegram_ids:
+            self.task_ids[telegram_id] = await self.existing_task_ids(http, telegram_id)
+    
+    def request(self, operation: str, telegram_id: int, rng: random.Random) -> Optional[tuple[str, str, Optional[dict]]]:
+        """
+        Choose the HTTP request performing an operation.
+        
+        Returns:
+            Optional[tuple]: Method, path and JSON body, or None if the user has no task to change
+        """
+        ids = self.task_ids[telegram_id]
+        if operation == "list":
+            query = f"?limit={self.args.page_size}" if self.args.page_size else ""
+            return "GET", f"/api/tasks{query}", None
+        if operation == "stats":
+            return "GET", "/api/tasks/stats", None
+        if operation == "create":
+            return "POST", "/api/tasks", make_task(rng)
+        if not ids:
+            return None
+        if operation == "update":
+            changes = rng.choice([
+                {"status": rng.choice(list(STATUS_WEIGHTS)).value},
+                {"priority": rng.choice(list(PRIORITY_WEIGHTS)).value},
+                {"title": rng.choice(TITLES)},
+            ])
+            return "PUT", f"/api/tasks/{rng.choice(ids)}", changes
+        # Take the ID out first so no other client updates or deletes it meanwhile
+        task_id = ids.pop(rng.randrange(len(ids)))
+        return "DELETE", f"/api/tasks/{task_id}", None
+    
+    async def client(self, http: aiohttp.ClientSession, deadline: float, seed: float) -> None:
+        """Send requests back to back until the deadline."""
+        rng = random.Random(seed)
+        operations, weights = zip(*self.mix.items())
+        while time.monotonic() < deadline:
+            operation = rng.choices(operations, weights=weights)[0]
+            telegram_id = rng.choice(self.telegram_ids)
+            request = self.request(operation, telegram_id, rng)
+            if request is None:
+                continue
+            method, path, body = request
+            
+            started = time.perf_counter()
+            try:
+                async with http.request(
+                    method, f"{self.url}{path}", json=body, headers={"Authorization": self.auth[telegram_id]}
+                ) as response:
+                    payload = await response.read()
+                    status = str(response.status)
+            except aiohttp.ClientError as e:
+                status = type(e).__name__
+                payload = None
+            duration = time.perf_counter() - started
+            
+            if operation == "create" and status == "200":
+                self.task_ids[telegram_id].append(json.loads(payload)["id"])
+            if self.recording:
+                self.durations[operation].append(duration)
+                self.statuses[operation][status] += 1
+    
+    async def drive(self, http: aiohttp.ClientSession) -> float:
+        """
+        Run the clients through warmup and the measured period.
+        
+        Returns:
+            float: Measured seconds
+        """
+        end = time.monotonic() + self.args.warmup + self.args.duration
+        seeds = [self.rng.random() for _ in range(self.args.concurrency)]
+        clients = asyncio.gather(*(self.client(http, end, seed) for seed in seeds))
+        
+        await asyncio.sleep(self.args.warmup)
+        self.recording = True
+        started = time.monotonic()
+        await clients
+        return time.monotonic() - started
+    
+    def summary(self, elapsed: float) -> dict:
+        """
+        Summarize the recorded latencies.
+        
+        Args:
+            elapsed: Measured seconds
+            
+        Returns:
+            dict: Totals and per-operation throughput, latency percentiles and status codes
+        """
+        operations = {}
+        for operation in OPERATIONS:
+            durations = sorted(self.durations.get(operation, []))
+            if not durations:
+                continue
+            ok = sum(count for status, count in self.statuses[operation].items() if status.startswith("2"))
+            operations[operation] = {
+                "requests": len(durations),
+                "throughput_rps": round(len(durations) / elapsed, 2),
+                "error_rate": round(1 - ok / len(durations), 4),
+                "mean_ms": round(sum(durations) / len(durations) * 1000, 3),
+                "p50_ms": round(percentile(durations, 0.50) * 1000, 3),
+                "p95_ms": round(percentile(durations, 0.95) * 1000, 3),
+                "p99_ms": round(percentile(durations, 0.99) * 1000, 3),
+                "max_ms": round(durations[-1] * 1000, 3),
+                "statuses": dict(self.statuses[operation]),
+            }
+        
+        everything = sorted(duration for durations in self.durations.values() for duration in durations)
+        requests = len(everything)
+        return {
+            "requests": requests,
+            "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(everything, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(everything, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(everything, 0.99) * 1000, 3),
+            "operations": operations,
+        }
+    
+    async def run(self) -> dict:
+        """
+        Prepare the data, drive the load and summarize it.
+        
+        Returns:
+            dict: Results with the run configuration
+        """
+        await self.create_users()
+        
+        connector = aiohttp.TCPConnector(limit=self.args.concurrency)
+        async with aiohttp.ClientSession(connector=connector) as http:
+            await self.authenticate(http)
+            if self.args.no_seed:
+                await self.load_task_ids(http)
+                print(f"Using existing tasks of {len(self.telegram_ids)} users")
+            else:
+                started = time.monotonic()
+                created = await self.seed(http)
+                print(f"Seeded {created} tasks for {len(self.telegram_ids)} users in {time.monotonic() - started:.1f}s")
+            
+            print(f"Running {self.args.concurrency} clients for {self.args.warmup}s warmup + {self.args.duration}s...")
+            elapsed = await self.drive(http)
+        
+        return {
+            "label": self.args.label,
+            "commit": git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "config": {
+                key: getattr(self.args, key)
+                for key in ("url", "users", "tasks_per_user", "concurrency", "duration", "warmup",
+                            "mix", "page_size", "auth", "seed")
+            },
+            "elapsed_s": round(elapsed, 3),
+            "results": self.summary(elapsed),
+        }
+
+
+def print_results(results: dict, baseline: Optional[dict] = None) -> None:
+    """
+    Print a results table, with changes against a baseline run if given.
+    
+    Args:
+        results: Results of this run
+        baseline: Results of an earlier run
+    """
+    rows = [("all", results["results"])] + list(results["results"]["operations"].items())
+    base_rows = {}
+    if baseline is not None:
+        base_rows = {"all": baseline["results"], **baseline["results"]["operations"]}
+    
+    def change(name: str, key: str, value: float) -> str:
+        base = base_rows.get(name, {}).get(key)
+        if not base:
+            return ""
+        return f" ({(value - base) / base * 100:+.0f}%)"
+    
+    print(f"{'operation':<10} {'requests':>9} {'req/s':>16} {'p50 ms':>16} {'p95 ms':>16} {'p99 ms':>16}  statuses")
+    for name, row in rows:
+        cells = [
+            f"{row[key]:.1f}{change(name, key, row[key])}"
+            for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+        ]
+        statuses = " ".join(f"{status}:{count}" for status, count in sorted(row.get("statuses", {}).items()))
+        print(f"{name:<10} {row['requests']:>9} " + " ".join(f"{cell:>16}" for cell in cells) + f"  {statuses}")
+
+
+def main() -> None:
+    """Run the load test from the command line."""
+    parser = argparse.ArgumentParser(description="Load test the tasks API")
+    parser.add_argument("--url", default=os.getenv("API_URL", "http://localhost:8000"), help="API base URL")
+    parser.add_argument("--users", type=int, default=50, help="synthetic users")
+    parser.add_argument("--tasks-per-user", type=int, default=40, help="average tasks seeded per user")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="seconds of load before measuring")
+    parser.add_argument(
+        "--mix", default="list=50,stats=20,create=10,update=15,delete=5", help="operation weights"
+    )
+    parser.add_argument("--page-size", type=int, default=50, help="limit of list requests (0 for whole lists)")
+    parser.add_argument(
+        "--auth", choices=["session", "init-data"], default="session",
+        help="send session tokens (like the Web App) or raw initData",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed for data and requests")
+    parser.add_argument("--first-telegram-id", type=int, default=9_000_000_000, help="Telegram ID of the first user")
+    parser.add_argument("--no-seed", action="store_true", help="keep the tasks left by an earlier run")
+    parser.add_argument("--label", default="", help="free-form name stored with the results")
+    parser.add_argument("--output", help="results file (default benchmarks/results/load-<commit>-<time>.json)")
+    parser.add_argument("--compare", help="results file of an earlier run to compare against")
+    args = parser.parse_args()
+    
+    results = asyncio.run(LoadTest(args).run())
+    
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print_results(results, baseline)
+    
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"load-{results['commit'] or 'unknown'}-{stamp}.json")
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Compare JSON and MessagePack task list bodies.
+
+Builds realistic task lists in memory (no database needed) and reports
+payload size, raw and gzipped, and encode/decode time for the encoders
+behind GET /api/tasks.
+
+Run from backend/ with the API environment loaded (e.g. inside the api
+container):
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --tasks 50 500 5000 --repeat 200
+"""
+import argparse
+import gzip
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+import orjson
+
+from api.content import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, unpackb
+from api.routers.tasks import TASK_FIELDS, encode_task_rows
+from benchmarks.common import DESCRIPTIONS, TITLES
+from database.models import TaskPriority, TaskStatus
+
+
+def make_rows(count: int, seed: int = 0) -> list[tuple]:
+    """
+    Build task rows shaped like a TASK_COLUMNS select.
+    
+    Args:
+        count: Number of tasks
+        seed: Random seed
+        
+    Returns:
+        list[tuple]: Rows in TASK_FIELDS order
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    rows = []
+    for task_id in range(count, 0, -1):
+        created_at = now - timedelta(minutes=task_id * 37, microseconds=rng.randrange(1_000_000))
+        task = {
+            "title": rng.choice(TITLES),
+            "description": rng.choice(DESCRIPTIONS),
+            "priority": rng.choice(list(TaskPriority)),
+            "deadline": created_at + timedelta(days=rng.randrange(1, 30)) if rng.random() < 0.4 else None,
+            "id": task_id,
+            "user_id": 1,
+            "status": rng.choice(list(TaskStatus)),
+            "created_at": created_at,
+            "updated_at": created_at + timedelta(seconds=rng.randrange(0, 86400)),
+        }
+        rows.append(tuple(task[field] for field in TASK_FIELDS))
+    return rows
+
+
+def time_call(function: Callable[[], object], repeat: int) -> float:
+    """
+    Measure the median duration of a call.
+    
+    Args:
+        function: Function to call
+        repeat: Number of calls
+        
+    Returns:
+        float: Median duration in microseconds
+    """
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations) * 1_000_000
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Compare JSON and MessagePack task list bodies")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[20, 200, 1000], help="list sizes to test")
+    parser.add_argument("--repeat", type=int, default=100, help="calls per measurement")
+    args = parser.parse_args()
+    
+    decoders = {JSON_MEDIA_TYPE: orjson.loads, MSGPACK_MEDIA_TYPE: unpackb}
+    
+    print(f"{'tasks':>6} {'format':<20} {'bytes':>9} {'gzip':>8} {'encode us':>10} {'decode us':>10}")
+    for count in args.tasks:
+        rows = make_rows(count)
+        for media_type, decode in decoders.items():
+            body = encode_task_rows(rows, media_type)
+            encode_us = time_call(lambda: encode_task_rows(rows, media_type), args.repeat)
+            decode_us = time_call(lambda: decode(body), args.repeat)
+            print(
+                f"{count:>6} {media_type:<20} {len(body):>9} {len(gzip.compress(body)):>8} "
+                f"{encode_us:>10.1f} {decode_us:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,13 @@ class BotConfig(BaseSettings):
     # Redis settings
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     
+    # Per-user rate limits by update type as "N/S" (N updates per S seconds; "0" disables)
+    rate_limit_message: str = os.getenv("RATE_LIMIT_MESSAGE", "20/60")
+    rate_limit_callback_query: str = os.getenv("RATE_LIMIT_CALLBACK_QUERY", "60/60")
+    
+    # Port of the Prometheus exporter in polling mode (0 disables; in webhook mode the API serves /metrics)
+    metrics_port: int = int(os.getenv("BOT_METRICS_PORT", "9101"))
+    
     # Logging
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
     
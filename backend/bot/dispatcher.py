@@ -0,0 +1,81 @@
+"""Bot and dispatcher wiring shared by polling, the webhook and benchmarks."""
+from typing import Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.base import BaseSession
+from aiogram.enums import ParseMode
+
+from bot.config import config
+from bot.handlers import start, tasks
+from bot.middlewares import (
+    DatabaseMiddleware,
+    HandlerTracingMiddleware,
+    MetricsMiddleware,
+    QueryStatsMiddleware,
+    RateLimitMiddleware,
+    TelegramMetricsMiddleware,
+    TelegramTracingMiddleware,
+    UpdateTracingMiddleware,
+)
+
+
+def create_bot(token: str, session: Optional[BaseSession] = None) -> Bot:
+    """
+    Create a bot with Bot API call metrics and tracing.
+    
+    Args:
+        token: Bot token
+        session: HTTP session (defaults to aiogram's aiohttp session)
+        
+    Returns:
+        Bot: Bot instance
+    """
+    bot = Bot(
+        token=token,
+        session=session,
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML)
+    )
+    bot.session.middleware(TelegramMetricsMiddleware())
+    bot.session.middleware(TelegramTracingMiddleware())
+    return bot
+
+
+def create_dispatcher(
+    rate_limit_message: str = config.rate_limit_message,
+    rate_limit_callback_query: str = config.rate_limit_callback_query,
+) -> Dispatcher:
+    """
+    Create the dispatcher with the bot's middlewares and routers.
+    
+    The handler routers can only be attached once, so call it once per process.
+    
+    Args:
+        rate_limit_message: Per-user message limit as "N/S" ("0" disables)
+        rate_limit_callback_query: Per-user callback query limit as "N/S" ("0" disables)
+        
+    Returns:
+        Dispatcher: Dispatcher ready to feed updates to
+    """
+    dp = Dispatcher()
+    
+    # Register middlewares (metrics and statement counts first to cover the whole chain;
+    # rate limits before the database, so rejected updates never open a session; handler spans
+    # last, so they leave out the middlewares)
+    dp.update.outer_middleware(UpdateTracingMiddleware())
+    dp.message.middleware(MetricsMiddleware())
+    dp.callback_query.middleware(MetricsMiddleware())
+    dp.message.middleware(QueryStatsMiddleware())
+    dp.callback_query.middleware(QueryStatsMiddleware())
+    dp.message.middleware(RateLimitMiddleware("message", rate_limit_message))
+    dp.callback_query.middleware(RateLimitMiddleware("callback_query", rate_limit_callback_query))
+    dp.message.middleware(DatabaseMiddleware())
+    dp.callback_query.middleware(DatabaseMiddleware())
+    dp.message.middleware(HandlerTracingMiddleware())
+    dp.callback_query.middleware(HandlerTracingMiddleware())
+    
+    # Register routers
+    dp.include_router(start.router)
+    dp.include_router(tasks.router)
+    
+    return dp
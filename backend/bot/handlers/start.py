@@ -9,12 +9,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.keyboards import get_main_keyboard
 from database.models import User
+from shared.user_resolver import user_resolver
 
 router = Router()
 logger = logging.getLogger(__name__)
 
 
-@router.message(CommandStart())
+@router.message(CommandStart(), flags={"query_budget": 2})
 async def cmd_start(message: Message, session: AsyncSession) -> None:
     """
     Handle /start command.
@@ -44,6 +45,7 @@ async def cmd_start(message: Message, session: AsyncSession) -> None:
             )
             session.add(user)
             await session.commit()
+            await user_resolver.invalidate(user_telegram_id)
             logger.info(f"Created new user: {user_telegram_id}")
         
         # Send welcome message with instructions to use Menu Button
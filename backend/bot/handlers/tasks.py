@@ -7,11 +7,14 @@ from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import CallbackQuery, Message
-from sqlalchemy import func, select, case
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.keyboards import get_main_keyboard, get_task_actions_keyboard
-from database.models import Task, TaskPriority, TaskStatus, User
+from database.counters import apply_task_delta, get_task_counters
+from database.models import Task, TaskPriority, TaskStatus
+from shared.task_events import publish_task_event
+from shared.user_resolver import user_resolver
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -22,7 +25,29 @@ class AddTaskStates(StatesGroup):
     waiting_for_title = State()
 
 
-@router.message(Command("mytasks"))
+def build_active_tasks_query(user_id: int, limit: int = 5) -> Select:
+    """
+    Build the query for a user's unfinished tasks, highest priority first.
+    
+    Served by the partial index ix_tasks_user_active_priority.
+    
+    Args:
+        user_id: Internal user ID
+        limit: Number of tasks
+        
+    Returns:
+        Select: Active tasks query
+    """
+    return (
+        select(Task)
+        .where(Task.user_id == user_id)
+        .where(Task.status != TaskStatus.DONE)
+        .order_by(Task.priority.desc(), Task.created_at.desc())
+        .limit(limit)
+    )
+
+
+@router.message(Command("mytasks"), flags={"query_budget": 3})
 async def cmd_my_tasks(message: Message, session: AsyncSession) -> None:
     """
     Handle /mytasks command - show user's tasks summary.
@@ -35,34 +60,17 @@ async def cmd_my_tasks(message: Message, session: AsyncSession) -> None:
         user_telegram_id = message.from_user.id
         
         # Get user
-        result = await session.execute(
-            select(User).where(User.telegram_id == user_telegram_id)
-        )
-        user = result.scalar_one_or_none()
+        user_id = await user_resolver.resolve(session, user_telegram_id)
         
-        if not user:
+        if user_id is None:
             await message.answer("❌ User not found. Please use /start first.")
             return
         
         # Get task statistics
-        result = await session.execute(
-            select(
-                func.count(Task.id).label("total"),
-                func.sum(case((Task.status == TaskStatus.TODO, 1), else_=0)).label("todo"),
-                func.sum(case((Task.status == TaskStatus.IN_PROGRESS, 1), else_=0)).label("in_progress"),
-                func.sum(case((Task.status == TaskStatus.DONE, 1), else_=0)).label("done"),
-            ).where(Task.user_id == user.id)
-        )
-        stats = result.one()
+        stats = await get_task_counters(session, user_id)
         
         # Get recent tasks
-        result = await session.execute(
-            select(Task)
-            .where(Task.user_id == user.id)
-            .where(Task.status != TaskStatus.DONE)
-            .order_by(Task.priority.desc(), Task.created_at.desc())
-            .limit(5)
-        )
+        result = await session.execute(build_active_tasks_query(user_id))
         recent_tasks = result.scalars().all()
         
         # Format response
@@ -93,7 +101,7 @@ async def cmd_my_tasks(message: Message, session: AsyncSession) -> None:
         await message.answer("❌ Error fetching tasks. Please try again.")
 
 
-@router.message(F.text == "📋 Мои задачи")
+@router.message(F.text == "📋 Мои задачи", flags={"query_budget": 2})
 async def show_my_tasks(message: Message, session: AsyncSession) -> None:
     """
     Handle '📋 Мои задачи' button - show user's tasks summary.
@@ -106,25 +114,14 @@ async def show_my_tasks(message: Message, session: AsyncSession) -> None:
         user_telegram_id = message.from_user.id
         
         # Get user
-        result = await session.execute(
-            select(User).where(User.telegram_id == user_telegram_id)
-        )
-        user = result.scalar_one_or_none()
+        user_id = await user_resolver.resolve(session, user_telegram_id)
         
-        if not user:
+        if user_id is None:
             await message.answer("❌ Пользователь не найден. Используйте /start.")
             return
         
         # Get task statistics
-        result = await session.execute(
-            select(
-                func.count(Task.id).label("total"),
-                func.sum(case((Task.status == TaskStatus.TODO, 1), else_=0)).label("todo"),
-                func.sum(case((Task.status == TaskStatus.IN_PROGRESS, 1), else_=0)).label("in_progress"),
-                func.sum(case((Task.status == TaskStatus.DONE, 1), else_=0)).label("done"),
-            ).where(Task.user_id == user.id)
-        )
-        stats = result.one()
+        stats = await get_task_counters(session, user_id)
         
         # Format response
         response_text = "📋 Ваши задачи:\n\n"
@@ -144,7 +141,7 @@ async def show_my_tasks(message: Message, session: AsyncSession) -> None:
         await message.answer("❌ Ошибка при получении задач.")
 
 
-@router.message(F.text == "📊 Статистика")
+@router.message(F.text == "📊 Статистика", flags={"query_budget": 2})
 async def show_statistics(message: Message, session: AsyncSession) -> None:
     """
     Handle '📊 Статистика' button - show user statistics.
@@ -157,23 +154,14 @@ async def show_statistics(message: Message, session: AsyncSession) -> None:
         user_telegram_id = message.from_user.id
         
         # Get user
-        result = await session.execute(
-            select(User).where(User.telegram_id == user_telegram_id)
-        )
-        user = result.scalar_one_or_none()
+        user_id = await user_resolver.resolve(session, user_telegram_id)
         
-        if not user:
+        if user_id is None:
             await message.answer("❌ Пользователь не найден. Используйте /start.")
             return
         
         # Get task statistics
-        result = await session.execute(
-            select(
-                func.count(Task.id).label("total"),
-                func.sum(case((Task.status == TaskStatus.DONE, 1), else_=0)).label("done"),
-            ).where(Task.user_id == user.id)
-        )
-        stats = result.one()
+        stats = await get_task_counters(session, user_id)
         
         # For now, just show basic stats
         # TODO: Implement streak calculation based on task completion dates
@@ -191,8 +179,8 @@ async def show_statistics(message: Message, session: AsyncSession) -> None:
         logger.error(f"Error in show_statistics handler: {e}", exc_info=True)
         await message.answer("❌ Ошибка при получении статистики.")
 
-@router.message(Command("help"))
-@router.message(F.text == "ℹ️ Помощь")
+@router.message(Command("help"), flags={"query_budget": 0})
+@router.message(F.text == "ℹ️ Помощь", flags={"query_budget": 0})
 async def show_help(message: Message) -> None:
     """
     Handle 'ℹ️ Помощь' button - show help information.
@@ -213,7 +201,7 @@ async def show_help(message: Message) -> None:
     )
 
 
-@router.message(Command("addtask"))
+@router.message(Command("addtask"), flags={"query_budget": 0})
 async def cmd_add_task(message: Message, state: FSMContext) -> None:
     """
     Handle /addtask command - start task creation process.
@@ -230,7 +218,7 @@ async def cmd_add_task(message: Message, state: FSMContext) -> None:
     await state.set_state(AddTaskStates.waiting_for_title)
 
 
-@router.message(AddTaskStates.waiting_for_title, F.text)
+@router.message(AddTaskStates.waiting_for_title, F.text, flags={"query_budget": 3})
 async def process_task_title(message: Message, state: FSMContext, session: AsyncSession) -> None:
     """
     Process task title and create task.
@@ -249,25 +237,27 @@ async def process_task_title(message: Message, state: FSMContext, session: Async
         user_telegram_id = message.from_user.id
         
         # Get user
-        result = await session.execute(
-            select(User).where(User.telegram_id == user_telegram_id)
-        )
-        user = result.scalar_one_or_none()
+        user_id = await user_resolver.resolve(session, user_telegram_id)
         
-        if not user:
+        if user_id is None:
             await message.answer("❌ User not found. Please use /start first.")
             await state.clear()
             return
         
         # Create task
         task = Task(
-            user_id=user.id,
+            user_id=user_id,
             title=message.text,
             status=TaskStatus.TODO,
             priority=TaskPriority.MEDIUM,
         )
         session.add(task)
+        await session.flush()
+        version = await apply_task_delta(
+            session, user_id, added=[(task.status, task.priority)], changed=[task.id]
+        )
         await session.commit()
+        await publish_task_event(user_id, version, changed=[task.id])
         
         await message.answer(
             f"✅ Task created successfully!\n\n"
@@ -286,7 +276,7 @@ async def process_task_title(message: Message, state: FSMContext, session: Async
         await state.clear()
 
 
-@router.callback_query(F.data.startswith("task_"))
+@router.callback_query(F.data.startswith("task_"), flags={"query_budget": 4})
 async def handle_task_action(callback: CallbackQuery, session: AsyncSession) -> None:
     """
     Handle task action callbacks.
@@ -299,9 +289,9 @@ async def handle_task_action(callback: CallbackQuery, session: AsyncSession) ->
         action, task_id = callback.data.split(":")
         task_id = int(task_id)
         
-        # Get task
+        # Get task, locked so a concurrent write can't change the old key counted below
         result = await session.execute(
-            select(Task).where(Task.id == task_id)
+            select(Task).where(Task.id == task_id).with_for_update()
         )
         task = result.scalar_one_or_none()
         
@@ -310,16 +300,14 @@ async def handle_task_action(callback: CallbackQuery, session: AsyncSession) ->
             return
         
         # Verify user owns the task
-        result = await session.execute(
-            select(User).where(User.id == task.user_id)
-        )
-        user = result.scalar_one_or_none()
+        user_id = await user_resolver.resolve(session, callback.from_user.id)
         
-        if not user or user.telegram_id != callback.from_user.id:
+        if user_id is None or task.user_id != user_id:
             await callback.answer("❌ You don't have permission for this task.")
             return
         
         # Perform action
+        old_key = (task.status, task.priority)
         if action == "task_done":
             task.status = TaskStatus.DONE
             status_text = "✅ marked as done"
@@ -331,7 +319,9 @@ async def handle_task_action(callback: CallbackQuery, session: AsyncSession) ->
             status_text = "⏳ moved to to do"
         elif action == "task_delete":
             await session.delete(task)
+            version = await apply_task_delta(session, user_id, removed=[old_key], deleted=[task.id])
             await session.commit()
+            await publish_task_event(user_id, version, deleted=[task.id])
             await callback.message.edit_text(
                 f"🗑 Task deleted:\n~~{task.title}~~",
                 parse_mode="Markdown"
@@ -343,7 +333,11 @@ async def handle_task_action(callback: CallbackQuery, session: AsyncSession) ->
             return
         
         task.updated_at = datetime.utcnow()
+        version = await apply_task_delta(
+            session, user_id, removed=[old_key], added=[(task.status, task.priority)], changed=[task.id]
+        )
         await session.commit()
+        await publish_task_event(user_id, version, changed=[task.id])
         
         await callback.message.edit_text(
             f"Task {status_text}!\n\n**{task.title}**",
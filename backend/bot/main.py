@@ -3,15 +3,16 @@ import asyncio
 import logging
 import sys
 
-from aiogram import Bot, Dispatcher
-from aiogram.client.default import DefaultBotProperties
-from aiogram.enums import ParseMode
 from aiogram.types import MenuButtonWebApp, WebAppInfo
+from prometheus_client import start_http_server
 
 from bot.config import config
-from bot.handlers import start, tasks
-from bot.middlewares import DatabaseMiddleware
-from database import close_db, init_db
+from bot.dispatcher import create_bot, create_dispatcher
+from database import close_db, init_db, warm_pool
+from shared.metrics import instrument_database
+from shared.query_stats import instrument_queries
+from shared.redis_client import close_redis, init_redis
+from shared.tracing import trace_database
 
 # Configure logging
 logging.basicConfig(
@@ -25,19 +26,16 @@ logger = logging.getLogger(__name__)
 async def main() -> None:
     """Main bot function."""
     # Initialize bot and dispatcher
-    bot = Bot(
-        token=config.bot_token,
-        default=DefaultBotProperties(parse_mode=ParseMode.HTML)
-    )
-    dp = Dispatcher()
+    bot = create_bot(config.bot_token)
+    dp = create_dispatcher()
     
-    # Register middlewares
-    dp.message.middleware(DatabaseMiddleware())
-    dp.callback_query.middleware(DatabaseMiddleware())
-    
-    # Register routers
-    dp.include_router(start.router)
-    dp.include_router(tasks.router)
+    # Export metrics
+    instrument_database()
+    instrument_queries()
+    trace_database()
+    if config.metrics_port:
+        start_http_server(config.metrics_port)
+        logger.info(f"Metrics exported on port {config.metrics_port}")
     
     # Initialize database
     try:
@@ -47,6 +45,14 @@ async def main() -> None:
         logger.error(f"Failed to initialize database: {e}")
         sys.exit(1)
     
+    try:
+        warmed = await warm_pool()
+        logger.info(f"Database pool warmed with {warmed} connections")
+    except Exception as e:
+        logger.warning(f"Failed to warm database pool: {e}")
+    
+    init_redis(config.redis_url)
+    
     # Delete webhook and start polling
     try:
         await bot.delete_webhook(drop_pending_updates=True)
@@ -76,6 +82,7 @@ async def main() -> None:
         logger.info("Bot stopping...")
     finally:
         await bot.session.close()
+        await close_redis()
         await close_db()
         logger.info("Bot stopped")
 
@@ -1,4 +1,17 @@
 """Middlewares package initialization."""
 from bot.middlewares.database import DatabaseMiddleware
+from bot.middlewares.metrics import MetricsMiddleware, TelegramMetricsMiddleware
+from bot.middlewares.query_stats import QueryStatsMiddleware
+from bot.middlewares.rate_limit import RateLimitMiddleware
+from bot.middlewares.tracing import HandlerTracingMiddleware, TelegramTracingMiddleware, UpdateTracingMiddleware
 
-__all__ = ["DatabaseMiddleware"]
+__all__ = [
+    "DatabaseMiddleware",
+    "HandlerTracingMiddleware",
+    "MetricsMiddleware",
+    "QueryStatsMiddleware",
+    "RateLimitMiddleware",
+    "TelegramMetricsMiddleware",
+    "TelegramTracingMiddleware",
+    "UpdateTracingMiddleware",
+]
@@ -5,10 +5,16 @@ from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
 
 from database import async_session_maker
+from shared.tracing import tracer
 
 
 class DatabaseMiddleware(BaseMiddleware):
-    """Middleware to provide database session to handlers."""
+    """
+    Middleware to provide database session to handlers.
+    
+    Traced as a DatabaseMiddleware span around the handler, with the
+    commit in a span of its own.
+    """
 
     async def __call__(
         self,
@@ -27,12 +33,14 @@ class DatabaseMiddleware(BaseMiddleware):
         Returns:
             Handler result
         """
-        async with async_session_maker() as session:
-            data["session"] = session
-            try:
-                result = await handler(event, data)
-                await session.commit()
-                return result
-            except Exception:
-                await session.rollback()
-                raise
+        with tracer.span("DatabaseMiddleware"):
+            async with async_session_maker() as session:
+                data["session"] = session
+                try:
+                    result = await handler(event, data)
+                    with tracer.span("db.commit"):
+                        await session.commit()
+                    return result
+                except Exception:
+                    await session.rollback()
+                    raise
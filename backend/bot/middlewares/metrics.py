@@ -0,0 +1,81 @@
+"""Metrics middlewares for aiogram."""
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject
+
+from shared.metrics import BOT_HANDLER_DURATION, TELEGRAM_API_DURATION, TELEGRAM_API_ERRORS
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """
+    Middleware recording handler latency by router and handler name.
+    
+    Register it as the first inner middleware, so the time includes the
+    other middlewares (rate limiting, the database session and its commit).
+    """
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """
+        Execute middleware.
+        
+        Args:
+            handler: Handler function
+            event: Telegram event
+            data: Handler data
+            
+        Returns:
+            Handler result
+        """
+        # Inner middlewares run after the handler was chosen
+        callback = data["handler"].callback
+        router = callback.__module__.rsplit(".", 1)[-1]
+        
+        outcome = "error"
+        started = time.perf_counter()
+        try:
+            result = await handler(event, data)
+            outcome = "ok"
+            return result
+        finally:
+            BOT_HANDLER_DURATION.labels(router, callback.__name__, outcome).observe(time.perf_counter() - started)
+
+
+class TelegramMetricsMiddleware(BaseRequestMiddleware):
+    """Bot session middleware recording Telegram Bot API call latency and errors."""
+    
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        """
+        Execute middleware.
+        
+        Args:
+            make_request: Next request middleware
+            bot: Bot making the request
+            method: Bot API method
+            
+        Returns:
+            Response[TelegramType]: Bot API response
+        """
+        name = type(method).__name__
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            TELEGRAM_API_ERRORS.labels(name, type(e).__name__).inc()
+            raise
+        finally:
+            TELEGRAM_API_DURATION.labels(name).observe(time.perf_counter() - started)
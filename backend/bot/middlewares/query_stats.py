@@ -0,0 +1,43 @@
+"""Database statement accounting middleware for aiogram."""
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import TelegramObject
+
+from shared.query_stats import track_queries
+
+
+class QueryStatsMiddleware(BaseMiddleware):
+    """
+    Middleware counting database statements and time per handled update.
+    
+    The counters are logged when the handler returns. Handlers declare
+    their budget with the query_budget flag, e.g.
+    @router.message(Command("mytasks"), flags={"query_budget": 2}).
+    Register it before DatabaseMiddleware so the commit is counted too.
+    """
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """
+        Execute middleware.
+        
+        Args:
+            handler: Handler function
+            event: Telegram event
+            data: Handler data
+            
+        Returns:
+            Handler result
+        """
+        callback = data["handler"].callback
+        name = f"{callback.__module__.rsplit('.', 1)[-1]}.{callback.__name__}"
+        
+        with track_queries(name) as stats:
+            stats.budget = get_flag(data, "query_budget")
+            return await handler(event, data)
@@ -0,0 +1,61 @@
+"""Rate limiting middleware for aiogram."""
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject
+
+from shared.rate_limit import parse_rate_limit, rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitMiddleware(BaseMiddleware):
+    """
+    Middleware dropping updates from users over their limit.
+
+    Register it before DatabaseMiddleware so rejected updates never open a
+    session. Rejected callback queries are answered so the button stops
+    spinning; rejected messages are dropped silently.
+    """
+
+    def __init__(self, update_type: str, spec: str) -> None:
+        """
+        Initialize middleware.
+
+        Args:
+            update_type: Update type the middleware is registered for; names the bucket
+            spec: Limit as "N/S" (N updates per S seconds; "0" disables)
+        """
+        self.update_type = update_type
+        self.limit = parse_rate_limit(spec)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """
+        Execute middleware.
+
+        Args:
+            handler: Handler function
+            event: Telegram event
+            data: Handler data
+
+        Returns:
+            Handler result, or None if the update was dropped
+        """
+        user = data.get("event_from_user")
+        if self.limit is None or user is None:
+            return await handler(event, data)
+
+        wait = await rate_limiter.acquire(f"bot:{self.update_type}", user.id, self.limit)
+        if not wait:
+            return await handler(event, data)
+
+        logger.info(f"Dropping {self.update_type} from {user.id}: rate limited for {wait:.1f}s")
+        if isinstance(event, CallbackQuery):
+            await event.answer("⏳ Слишком много запросов, попробуйте позже.")
+        return None
@@ -0,0 +1,103 @@
+"""Tracing middlewares for aiogram."""
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject, Update
+
+from shared.tracing import tracer
+
+
+class UpdateTracingMiddleware(BaseMiddleware):
+    """
+    Outer update middleware running each update in a span.
+    
+    In polling mode the span starts a trace; in webhook mode it is a child
+    of the POST /webhook request span.
+    """
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+        """
+        Execute middleware.
+        
+        Args:
+            handler: Next handler
+            event: Telegram update
+            data: Handler data
+            
+        Returns:
+            Handler result
+        """
+        attributes = {"update.id": event.update_id, "update.type": event.event_type}
+        with tracer.span(f"update {event.event_type}", "consumer", attributes):
+            return await handler(event, data)
+
+
+class HandlerTracingMiddleware(BaseMiddleware):
+    """
+    Inner middleware running the handler in a span.
+    
+    Register it last, so the span covers the handler alone and the time
+    spent in the other middlewares shows up in the spans around it.
+    """
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """
+        Execute middleware.
+        
+        Args:
+            handler: Handler function
+            event: Telegram event
+            data: Handler data
+            
+        Returns:
+            Handler result
+        """
+        callback = data["handler"].callback
+        with tracer.span(f"handler {callback.__module__.rsplit('.', 1)[-1]}.{callback.__name__}"):
+            return await handler(event, data)
+
+
+class TelegramTracingMiddleware(BaseRequestMiddleware):
+    """Bot session middleware running Telegram Bot API calls in client spans."""
+    
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        """
+        Execute middleware.
+        
+        Args:
+            make_request: Next request middleware
+            bot: Bot making the request
+            method: Bot API method
+            
+        Returns:
+            Response[TelegramType]: Bot API response
+        """
+        span = tracer.start_child(f"telegram {type(method).__name__}", "client")
+        if span is None:
+            return await make_request(bot, method)
+        
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            span.record_error(e)
+            raise
+        finally:
+            span.end()
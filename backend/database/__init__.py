@@ -1,6 +1,15 @@
 """Database package initialization."""
-from database.database import async_session_maker, close_db, engine, get_db, init_db
-from database.models import Base, Task, TaskPriority, TaskStatus, User
+from database.database import (
+    async_session_maker,
+    close_db,
+    engine,
+    get_db,
+    get_pool_stats,
+    init_db,
+    pool_stats,
+    warm_pool,
+)
+from database.models import Base, Task, TaskChange, TaskPriority, TaskStatus, User, UserTaskCounters
 
 __all__ = [
     "Base",
@@ -8,9 +17,14 @@ __all__ = [
     "Task",
     "TaskStatus",
     "TaskPriority",
+    "UserTaskCounters",
+    "TaskChange",
     "engine",
     "async_session_maker",
     "get_db",
     "init_db",
     "close_db",
+    "warm_pool",
+    "get_pool_stats",
+    "pool_stats",
 ]
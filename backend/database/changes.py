@@ -0,0 +1,106 @@
+"""Task change log used for delta sync, including tombstones for deleted tasks.
+
+Entries are written by ``database.counters.apply_task_delta`` and dropped
+once they are older than the retention window. Compaction raises each
+user's ``changes_floor`` so clients syncing from before it get a full reset.
+
+Run ``python -m database.changes`` to compact once, or
+``python -m database.changes --retention-days N`` to override the window.
+"""
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.database import async_session_maker, close_db
+from database.models import TaskChange, UserTaskCounters
+
+logger = logging.getLogger(__name__)
+
+# How long change log entries (and so tombstones) are kept
+TASK_CHANGES_RETENTION_DAYS = float(os.getenv("TASK_CHANGES_RETENTION_DAYS", "30"))
+
+# Seconds between background compaction runs
+TASK_CHANGES_COMPACTION_INTERVAL = float(os.getenv("TASK_CHANGES_COMPACTION_INTERVAL", "3600"))
+
+
+async def compact_task_changes(
+    session: AsyncSession,
+    retention: timedelta = timedelta(days=TASK_CHANGES_RETENTION_DAYS),
+) -> int:
+    """
+    Drop change log entries older than the retention window.
+
+    Args:
+        session: Database session
+        retention: Age after which entries are dropped
+
+    Returns:
+        int: Number of entries dropped
+    """
+    cutoff = datetime.now(timezone.utc) - retention
+
+    # Clients that synced before the newest dropped entry must start over
+    dropped = (
+        select(TaskChange.user_id, func.max(TaskChange.version).label("version"))
+        .where(TaskChange.changed_at < cutoff)
+        .group_by(TaskChange.user_id)
+        .subquery()
+    )
+    await session.execute(
+        update(UserTaskCounters)
+        .where(UserTaskCounters.user_id == dropped.c.user_id)
+        .values(changes_floor=func.greatest(UserTaskCounters.changes_floor, dropped.c.version))
+    )
+
+    result = await session.execute(delete(TaskChange).where(TaskChange.changed_at < cutoff))
+    return result.rowcount
+
+
+async def run_compaction(interval: float = TASK_CHANGES_COMPACTION_INTERVAL) -> None:
+    """
+    Compact the change log periodically until cancelled.
+
+    Safe to run in several processes at once; compaction is idempotent.
+
+    Args:
+        interval: Seconds between runs
+    """
+    while True:
+        try:
+            async with async_session_maker() as session:
+                dropped = await compact_task_changes(session)
+                await session.commit()
+            if dropped:
+                logger.info(f"Compacted {dropped} task change log entries")
+        except Exception as e:
+            logger.warning(f"Task change log compaction failed: {e}")
+        await asyncio.sleep(interval)
+
+
+async def main() -> None:
+    """Compact the task change log from the command line."""
+    parser = argparse.ArgumentParser(description="Drop task change log entries older than the retention window")
+    parser.add_argument(
+        "--retention-days",
+        type=float,
+        default=TASK_CHANGES_RETENTION_DAYS,
+        help="keep entries for this many days",
+    )
+    args = parser.parse_args()
+
+    try:
+        async with async_session_maker() as session:
+            dropped = await compact_task_changes(session, timedelta(days=args.retention_days))
+            await session.commit()
+        print(f"Dropped {dropped} task change log entries")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,239 @@
+"""Per-user task counters maintained in the same transaction as task writes.
+
+Each write also increments the user's data version, which read endpoints
+expose as an ETag so unchanged data can be answered with 304 Not Modified,
+and records the written task IDs in the change log at that version (see
+``database.changes``).
+
+Run ``python -m database.counters`` to rebuild all counters from the tasks
+table, or ``python -m database.counters --user-id N`` for a single user.
+"""
+import argparse
+import asyncio
+from collections import Counter
+from typing import Iterable, Optional
+
+from sqlalchemy import Boolean, Integer, case, func, literal, select, true, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.database import async_session_maker, close_db
+from database.models import Task, TaskChange, TaskPriority, TaskStatus, UserTaskCounters
+
+# (status, priority) of a task as seen by the counters
+TaskKey = tuple[TaskStatus, TaskPriority]
+
+STATUS_COLUMNS = {
+    TaskStatus.TODO: "todo",
+    TaskStatus.IN_PROGRESS: "in_progress",
+    TaskStatus.DONE: "done",
+}
+
+PRIORITY_COLUMNS = {
+    TaskPriority.HIGH: "high_priority",
+    TaskPriority.MEDIUM: "medium_priority",
+    TaskPriority.LOW: "low_priority",
+}
+
+COUNTER_COLUMNS = ["total", *STATUS_COLUMNS.values(), *PRIORITY_COLUMNS.values()]
+
+
+def counter_deltas(removed: Iterable[TaskKey] = (), added: Iterable[TaskKey] = ()) -> dict[str, int]:
+    """
+    Compute counter changes for tasks leaving and entering a user's counts.
+
+    An update is expressed as removing the old key and adding the new one.
+
+    Args:
+        removed: Keys of deleted tasks or old keys of updated tasks
+        added: Keys of created tasks or new keys of updated tasks
+
+    Returns:
+        dict[str, int]: Non-zero changes by counter column
+    """
+    deltas: Counter[str] = Counter()
+    for sign, keys in ((-1, removed), (1, added)):
+        for status, priority in keys:
+            deltas["total"] += sign
+            deltas[STATUS_COLUMNS[TaskStatus(status)]] += sign
+            deltas[PRIORITY_COLUMNS[TaskPriority(priority)]] += sign
+    return {column: delta for column, delta in deltas.items() if delta}
+
+
+async def apply_task_delta(
+    session: AsyncSession,
+    user_id: int,
+    removed: Iterable[TaskKey] = (),
+    added: Iterable[TaskKey] = (),
+    changed: Iterable[int] = (),
+    deleted: Iterable[int] = (),
+) -> int:
+    """
+    Update a user's counters and bump their data version within the current transaction.
+
+    Call this once per write transaction, even when no counted field
+    changed, so the data version moves. The counters row stays locked
+    until commit, which serializes a user's writers in version order.
+    Written task IDs go to the change log in the same statement.
+
+    Args:
+        session: Database session
+        user_id: Internal user ID
+        removed: Keys of deleted tasks or old keys of updated tasks
+        added: Keys of created tasks or new keys of updated tasks
+        changed: IDs of created or updated tasks
+        deleted: IDs of deleted tasks
+
+    Returns:
+        int: The user's new data version
+    """
+    deltas = counter_deltas(removed, added)
+
+    # One log entry per task; a delete supersedes earlier writes in the same transaction
+    entries = dict.fromkeys(changed, False)
+    entries.update(dict.fromkeys(deleted, True))
+
+    table = UserTaskCounters.__table__
+    statement = (
+        insert(UserTaskCounters)
+        .values(user_id=user_id, data_version=1, **deltas)
+        .on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={
+                "data_version": table.c.data_version + 1,
+                **{column: table.c[column] + delta for column, delta in deltas.items()},
+            },
+        )
+        .returning(table.c.data_version)
+    )
+
+    if entries:
+        bump = statement.cte("bump")
+        logged = func.unnest(
+            literal(list(entries), ARRAY(Integer)),
+            literal(list(entries.values()), ARRAY(Boolean)),
+        ).table_valued("task_id", "deleted").render_derived()
+        log = (
+            insert(TaskChange)
+            .from_select(
+                ["user_id", "version", "task_id", "deleted"],
+                select(literal(user_id), bump.c.data_version, logged.c.task_id, logged.c.deleted)
+                .select_from(bump)
+                .join(logged, true()),
+            )
+            .cte("log")
+        )
+        statement = select(bump.c.data_version).add_cte(log)
+
+    result = await session.execute(statement)
+    return result.scalar_one()
+
+
+async def get_data_version(session: AsyncSession, user_id: int) -> int:
+    """
+    Get a user's current data version with a single primary key lookup.
+
+    Args:
+        session: Database session
+        user_id: Internal user ID
+
+    Returns:
+        int: Data version (0 if the user has never written a task)
+    """
+    result = await session.execute(
+        select(UserTaskCounters.data_version).where(UserTaskCounters.user_id == user_id)
+    )
+    return result.scalar_one_or_none() or 0
+
+
+async def get_task_counters(session: AsyncSession, user_id: int) -> UserTaskCounters:
+    """
+    Get a user's counters with a single primary key lookup.
+
+    Args:
+        session: Database session
+        user_id: Internal user ID
+
+    Returns:
+        UserTaskCounters: Counters (all zero if the user has never had a task)
+    """
+    result = await session.execute(
+        select(UserTaskCounters).where(UserTaskCounters.user_id == user_id)
+    )
+    return result.scalar_one_or_none() or empty_task_counters(user_id)
+
+
+def empty_task_counters(user_id: int) -> UserTaskCounters:
+    """
+    Build all-zero counters for a user who has never had a task (not added to any session).
+
+    Args:
+        user_id: Internal user ID
+
+    Returns:
+        UserTaskCounters: Counters at data version 0
+    """
+    return UserTaskCounters(
+        user_id=user_id, data_version=0, changes_floor=0, **{column: 0 for column in COUNTER_COLUMNS}
+    )
+
+
+async def recompute_task_counters(session: AsyncSession, user_id: Optional[int] = None) -> int:
+    """
+    Rebuild counters from the tasks table.
+
+    Args:
+        session: Database session
+        user_id: Rebuild only this user (all users if None)
+
+    Returns:
+        int: Number of counter rows rebuilt
+    """
+    aggregates = select(
+        Task.user_id,
+        func.count(Task.id),
+        *(func.sum(case((Task.status == status, 1), else_=0)) for status in STATUS_COLUMNS),
+        *(func.sum(case((Task.priority == priority, 1), else_=0)) for priority in PRIORITY_COLUMNS),
+    ).group_by(Task.user_id)
+
+    if user_id is not None:
+        aggregates = aggregates.where(Task.user_id == user_id)
+
+    statement = insert(UserTaskCounters).from_select(["user_id", *COUNTER_COLUMNS], aggregates)
+    statement = statement.on_conflict_do_update(
+        index_elements=[UserTaskCounters.user_id],
+        set_={column: statement.excluded[column] for column in COUNTER_COLUMNS},
+    )
+    result = await session.execute(statement)
+    rebuilt = result.rowcount
+
+    # Users whose tasks are all gone have no aggregate row
+    stale = (
+        update(UserTaskCounters)
+        .where(~select(Task.id).where(Task.user_id == UserTaskCounters.user_id).exists())
+        .values(**{column: 0 for column in COUNTER_COLUMNS})
+    )
+    if user_id is not None:
+        stale = stale.where(UserTaskCounters.user_id == user_id)
+    result = await session.execute(stale)
+
+    return rebuilt + result.rowcount
+
+
+async def main() -> None:
+    """Rebuild task counters from the command line."""
+    parser = argparse.ArgumentParser(description="Rebuild per-user task counters from the tasks table")
+    parser.add_argument("--user-id", type=int, default=None, help="rebuild a single user")
+    args = parser.parse_args()
+
+    try:
+        async with async_session_maker() as session:
+            rebuilt = await recompute_task_counters(session, args.user_id)
+            await session.commit()
+        print(f"Rebuilt task counters for {rebuilt} user(s)")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
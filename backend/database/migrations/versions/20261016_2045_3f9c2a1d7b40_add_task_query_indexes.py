@@ -0,0 +1,57 @@
+"""Add task query indexes
+
+Composite indexes for the task list (filtered by status/priority, ordered
+by created_at) and a partial index for the active tasks summary. The
+single-column user_id index is a prefix of ix_tasks_user_created and is
+dropped.
+
+Tables are created by the application on startup, which may already have
+created these indexes from the models, hence IF [NOT] EXISTS throughout.
+
+Revision ID: 3f9c2a1d7b40
+Revises: 
+Create Date: 2026-10-16 20:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9c2a1d7b40"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_tasks_user_created",
+        "tasks",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_tasks_user_status_priority_created",
+        "tasks",
+        ["user_id", "status", "priority", sa.text("created_at DESC"), sa.text("id DESC")],
+        if_not_exists=True,
+    )
+    # Enum columns store member names, so DONE is stored as 'DONE'
+    op.create_index(
+        "ix_tasks_user_active_priority",
+        "tasks",
+        ["user_id", sa.text("priority DESC"), sa.text("created_at DESC")],
+        postgresql_where=sa.text("status != 'DONE'"),
+        if_not_exists=True,
+    )
+    op.drop_index("ix_tasks_user_id", table_name="tasks", if_exists=True)
+
+
+def downgrade() -> None:
+    op.create_index("ix_tasks_user_id", "tasks", ["user_id"], if_not_exists=True)
+    op.drop_index("ix_tasks_user_active_priority", table_name="tasks", if_exists=True)
+    op.drop_index("ix_tasks_user_status_priority_created", table_name="tasks", if_exists=True)
+    op.drop_index("ix_tasks_user_created", table_name="tasks", if_exists=True)
@@ -0,0 +1,78 @@
+"""Add user task counters
+
+Per-user task counts maintained by the application on every task write,
+so statistics reads are a primary key lookup. Existing users are
+backfilled from the tasks table; rerun the backfill at any time with
+``python -m database.counters``.
+
+Revision ID: 8b1e4c7d2a95
+Revises: 3f9c2a1d7b40
+Create Date: 2026-10-16 21:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8b1e4c7d2a95"
+down_revision: Union[str, None] = "3f9c2a1d7b40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTER_COLUMNS = [
+    "total",
+    "todo",
+    "in_progress",
+    "done",
+    "high_priority",
+    "medium_priority",
+    "low_priority",
+]
+
+
+def upgrade() -> None:
+    # The application may already have created the table on startup
+    if not sa.inspect(op.get_bind()).has_table("user_task_counters"):
+        op.create_table(
+            "user_task_counters",
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            *(
+                sa.Column(column, sa.Integer(), server_default="0", nullable=False)
+                for column in COUNTER_COLUMNS
+            ),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("user_id"),
+        )
+
+    # Enum columns store member names
+    op.execute(
+        """
+        INSERT INTO user_task_counters (user_id, total, todo, in_progress, done,
+                                        high_priority, medium_priority, low_priority)
+        SELECT user_id,
+               count(*),
+               count(*) FILTER (WHERE status = 'TODO'),
+               count(*) FILTER (WHERE status = 'IN_PROGRESS'),
+               count(*) FILTER (WHERE status = 'DONE'),
+               count(*) FILTER (WHERE priority = 'HIGH'),
+               count(*) FILTER (WHERE priority = 'MEDIUM'),
+               count(*) FILTER (WHERE priority = 'LOW')
+        FROM tasks
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET
+            total = EXCLUDED.total,
+            todo = EXCLUDED.todo,
+            in_progress = EXCLUDED.in_progress,
+            done = EXCLUDED.done,
+            high_priority = EXCLUDED.high_priority,
+            medium_priority = EXCLUDED.medium_priority,
+            low_priority = EXCLUDED.low_priority
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_task_counters")
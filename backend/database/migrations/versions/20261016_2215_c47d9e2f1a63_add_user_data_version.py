@@ -0,0 +1,35 @@
+"""Add user data version
+
+Per-user counter incremented by every task write and served as the ETag
+of the task list and statistics endpoints.
+
+Revision ID: c47d9e2f1a63
+Revises: 8b1e4c7d2a95
+Create Date: 2026-10-16 22:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c47d9e2f1a63"
+down_revision: Union[str, None] = "8b1e4c7d2a95"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The application may already have created the column on startup
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("user_task_counters")}
+    if "data_version" not in columns:
+        op.add_column(
+            "user_task_counters",
+            sa.Column("data_version", sa.BigInteger(), server_default="0", nullable=False),
+        )
+
+
+def downgrade() -> None:
+    op.drop_column("user_task_counters", "data_version")
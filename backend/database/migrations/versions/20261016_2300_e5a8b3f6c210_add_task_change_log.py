@@ -0,0 +1,55 @@
+"""Add task change log
+
+Change log (including tombstones for deleted tasks) behind
+GET /api/tasks/changes. Writes made before this revision were not logged,
+so every existing user's changes_floor starts at their current data
+version and clients syncing from earlier get a full reset.
+
+Revision ID: e5a8b3f6c210
+Revises: c47d9e2f1a63
+Create Date: 2026-10-16 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a8b3f6c210"
+down_revision: Union[str, None] = "c47d9e2f1a63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The application may already have created the table and column on startup
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("task_changes"):
+        op.create_table(
+            "task_changes",
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("version", sa.BigInteger(), nullable=False),
+            sa.Column("task_id", sa.Integer(), nullable=False),
+            sa.Column("deleted", sa.Boolean(), server_default="false", nullable=False),
+            sa.Column("changed_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("user_id", "version", "task_id"),
+        )
+        op.create_index("ix_task_changes_changed_at", "task_changes", ["changed_at"])
+
+    columns = {column["name"] for column in inspector.get_columns("user_task_counters")}
+    if "changes_floor" not in columns:
+        op.add_column(
+            "user_task_counters",
+            sa.Column("changes_floor", sa.BigInteger(), server_default="0", nullable=False),
+        )
+
+    op.execute("UPDATE user_task_counters SET changes_floor = data_version WHERE changes_floor < data_version")
+
+
+def downgrade() -> None:
+    op.drop_column("user_task_counters", "changes_floor")
+    op.drop_index("ix_task_changes_changed_at", table_name="task_changes")
+    op.drop_table("task_changes")
@@ -3,7 +3,7 @@ from datetime import datetime
 from enum import Enum as PyEnum
 from typing import Optional
 
-from sqlalchemy import BigInteger, DateTime, Enum, ForeignKey, String, Text, func
+from sqlalchemy import BigInteger, Boolean, DateTime, Enum, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -49,7 +49,7 @@ class Task(Base):
     __tablename__ = "tasks"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     title: Mapped[str] = mapped_column(String(500), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     status: Mapped[TaskStatus] = mapped_column(
@@ -77,3 +77,58 @@ class Task(Base):
 
     def __repr__(self) -> str:
         return f"<Task(id={self.id}, title={self.title}, status={self.status}, priority={self.priority})>"
+
+
+class UserTaskCounters(Base):
+    """Per-user task counts kept in step with every task write."""
+    __tablename__ = "user_task_counters"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    todo: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    in_progress: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    done: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    high_priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    medium_priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    low_priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # Incremented by every task write; exposed to clients as an ETag
+    data_version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
+    # Highest data version whose change log entries have been compacted away
+    changes_floor: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
+
+    def __repr__(self) -> str:
+        return f"<UserTaskCounters(user_id={self.user_id}, total={self.total})>"
+
+
+class TaskChange(Base):
+    """Change log entry: a task was written (or deleted) at a user's data version."""
+    __tablename__ = "task_changes"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    # No foreign key: tombstones outlive the task
+    task_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default="false")
+    changed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    def __repr__(self) -> str:
+        return f"<TaskChange(user_id={self.user_id}, version={self.version}, task_id={self.task_id})>"
+
+
+# Task indexes matching the list and summary queries (see migration 3f9c2a1d7b40)
+Index("ix_tasks_user_created", Task.user_id, Task.created_at.desc(), Task.id.desc())
+Index(
+    "ix_tasks_user_status_priority_created",
+    Task.user_id,
+    Task.status,
+    Task.priority,
+    Task.created_at.desc(),
+    Task.id.desc(),
+)
+Index(
+    "ix_tasks_user_active_priority",
+    Task.user_id,
+    Task.priority.desc(),
+    Task.created_at.desc(),
+    postgresql_where=Task.status != TaskStatus.DONE,
+)
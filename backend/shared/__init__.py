@@ -1,6 +1,16 @@
 """Shared package initialization."""
 from shared.schemas import (
+    BootstrapResponse,
+    SessionResponse,
     TaskBase,
+    TaskBatchCreate,
+    TaskBatchDelete,
+    TaskBatchOperation,
+    TaskBatchRequest,
+    TaskBatchResponse,
+    TaskBatchResult,
+    TaskBatchUpdate,
+    TaskChangesResponse,
     TaskCreate,
     TaskResponse,
     TaskStatsResponse,
@@ -19,4 +29,14 @@ __all__ = [
     "TaskUpdate",
     "TaskResponse",
     "TaskStatsResponse",
+    "TaskBatchCreate",
+    "TaskBatchUpdate",
+    "TaskBatchDelete",
+    "TaskBatchOperation",
+    "TaskBatchRequest",
+    "TaskBatchResult",
+    "TaskBatchResponse",
+    "TaskChangesResponse",
+    "BootstrapResponse",
+    "SessionResponse",
 ]
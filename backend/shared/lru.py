@@ -0,0 +1,71 @@
+"""Small in-process LRU cache with time-based expiry."""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """Bounded LRU cache whose entries expire after a fixed TTL."""
+    
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """
+        Initialize cache.
+        
+        Args:
+            maxsize: Maximum number of entries
+            ttl: Entry lifetime in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a value by key.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Optional[Any]: Cached value or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def pop(self, key: Hashable) -> None:
+        """
+        Remove a value if present.
+        
+        Args:
+            key: Cache key
+        """
+        self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,120 @@
+"""Prometheus metrics shared by the API and the bot.
+
+Metrics live in the default registry of the process: the API serves them
+at GET /metrics (including the bot's when it runs in webhook mode), the
+polling bot on its own exporter port.
+"""
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from database import engine, pool_stats
+
+# Latency buckets in seconds, from sub-millisecond queries to slow requests
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Statement kinds used as the operation label; anything else is counted as "OTHER"
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, including time queued by admission control",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+BOT_HANDLER_DURATION = Histogram(
+    "bot_handler_duration_seconds",
+    "Bot handler latency, including its middlewares",
+    ["router", "handler", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Database statement execution time (the count is the number of statements)",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total",
+    "Database statements that raised",
+    ["operation"],
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent getting a connection from the pool",
+    buckets=LATENCY_BUCKETS,
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool",
+)
+
+TELEGRAM_API_DURATION = Histogram(
+    "telegram_api_request_duration_seconds",
+    "Telegram Bot API call latency by method",
+    ["method"],
+    buckets=LATENCY_BUCKETS,
+)
+
+TELEGRAM_API_ERRORS = Counter(
+    "telegram_api_errors_total",
+    "Telegram Bot API calls that failed, by method and error type",
+    ["method", "error"],
+)
+
+
+def sql_operation(statement: str) -> str:
+    """
+    Get the operation label of a SQL statement.
+    
+    Args:
+        statement: SQL text
+        
+    Returns:
+        str: Leading keyword, or "OTHER"
+    """
+    words = statement.split(None, 1)
+    keyword = words[0].upper() if words else ""
+    return keyword if keyword in SQL_OPERATIONS else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    DB_QUERY_DURATION.labels(sql_operation(statement)).observe(time.perf_counter() - context._metrics_started)
+
+
+def _handle_error(exception_context) -> None:
+    if exception_context.statement is not None:
+        DB_QUERY_ERRORS.labels(sql_operation(exception_context.statement)).inc()
+
+
+def instrument_database(sync_engine: Engine = engine.sync_engine) -> None:
+    """
+    Record statement and pool metrics for an engine.
+    
+    Safe to call more than once.
+    
+    Args:
+        sync_engine: Synchronous engine behind the async engine
+    """
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+    
+    pool_stats.observers.append(DB_POOL_CHECKOUT_WAIT.observe)
+    if isinstance(sync_engine.pool, QueuePool):
+        DB_POOL_CHECKED_OUT.set_function(sync_engine.pool.checkedout)
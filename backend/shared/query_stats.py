@@ -0,0 +1,211 @@
+"""Per-request accounting of database statements.
+
+Statements run while a request (or bot update) is tracked are counted and
+timed against it, so each response can report its round trips and DB time
+and go over a declared budget loudly. Tracking nests: statements count
+towards every enclosing block, and budgets apply to the innermost.
+Independently of tracking, statements slower than SLOW_QUERY_MS are logged with their parameter
+values redacted, and statements repeated QUERY_REPEAT_THRESHOLD times
+within one request (N+1 patterns) are logged when it ends.
+
+Budgets are upper bounds for a cold cache. Going over one logs a warning;
+with QUERY_BUDGET_STRICT=true (for tests and development) the statement
+over budget raises QueryBudgetExceeded instead, failing the request.
+"""
+import logging
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))  # 0 disables
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))  # 0 disables
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
+
+# Longest statement text written to the log
+MAX_LOGGED_STATEMENT = 1000
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request ran more statements than its budget (strict mode only)."""
+
+
+class QueryStats:
+    """Statements run on behalf of one API request or bot update."""
+    
+    def __init__(self, name: str, parent: Optional["QueryStats"] = None) -> None:
+        """
+        Initialize with no statements.
+        
+        Args:
+            name: What is tracked, for log messages (e.g. "GET /api/tasks")
+            parent: Statistics of the enclosing tracked block
+        """
+        self.name = name
+        self.parent = parent
+        self.statements = 0
+        self.duration = 0.0
+        self.budget: Optional[int] = None
+        self.repeats: Counter[str] = Counter()
+    
+    @property
+    def over_budget(self) -> bool:
+        """Whether more statements ran than the budget allows."""
+        return self.budget is not None and self.statements > self.budget
+    
+    def fields(self) -> dict:
+        """
+        Get the counters as log fields.
+        
+        Returns:
+            dict: Statement count, DB time in milliseconds and budget
+        """
+        return {
+            "db_queries": self.statements,
+            "db_time_ms": round(self.duration * 1000, 3),
+            "db_query_budget": self.budget,
+        }
+    
+    def report(self) -> None:
+        """Log the counters, and warn about budget overruns and repeated statements."""
+        fields = self.fields()
+        summary = f"{self.name}: {self.statements} statements in {fields['db_time_ms']} ms"
+        
+        if self.over_budget:
+            logger.warning(f"{summary}, over its budget of {self.budget}", extra=fields)
+        else:
+            logger.debug(summary, extra=fields)
+        
+        if QUERY_REPEAT_THRESHOLD:
+            for statement, count in self.repeats.items():
+                if count >= QUERY_REPEAT_THRESHOLD:
+                    logger.warning(
+                        f"{self.name}: statement ran {count} times: {shorten_statement(statement)}",
+                        extra=fields,
+                    )
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """
+    Get the statistics of the request being handled.
+    
+    Returns:
+        Optional[QueryStats]: Statistics, or None outside tracked requests
+    """
+    return _current.get()
+
+
+@contextmanager
+def track_queries(name: str) -> Iterator[QueryStats]:
+    """
+    Count statements run inside the block, including in tasks it starts.
+    
+    The counters are logged when the block exits.
+    
+    Args:
+        name: What is tracked, for log messages
+        
+    Yields:
+        QueryStats: Counters updated as statements run
+    """
+    stats = QueryStats(name, _current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        stats.report()
+
+
+def set_query_budget(statements: int) -> None:
+    """
+    Declare how many statements the current request may run.
+    
+    Args:
+        statements: Maximum number of statements
+    """
+    stats = _current.get()
+    if stats is not None:
+        stats.budget = statements
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """
+    Replace statement parameter values with their type names.
+    
+    Args:
+        parameters: DBAPI parameters (sequence or mapping)
+        executemany: Whether parameters holds one set per row
+        
+    Returns:
+        Any: Parameters with the same shape and no values
+    """
+    if executemany:
+        return f"<{len(parameters)} rows>"
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def shorten_statement(statement: str) -> str:
+    """Collapse whitespace and truncate a statement for logging."""
+    statement = " ".join(statement.split())
+    if len(statement) > MAX_LOGGED_STATEMENT:
+        return statement[:MAX_LOGGED_STATEMENT] + "..."
+    return statement
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    if QUERY_BUDGET_STRICT and stats is not None and stats.budget is not None and stats.statements >= stats.budget:
+        raise QueryBudgetExceeded(f"{stats.name} went over its budget of {stats.budget} statements")
+    context._query_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    duration = time.perf_counter() - context._query_stats_started
+    
+    stats = _current.get()
+    tracked = stats
+    while tracked is not None:
+        tracked.statements += 1
+        tracked.duration += duration
+        tracked.repeats[statement] += 1
+        tracked = tracked.parent
+    
+    if SLOW_QUERY_MS and duration * 1000 >= SLOW_QUERY_MS:
+        logger.warning(
+            f"Slow statement ({duration * 1000:.1f} ms"
+            f"{f' in {stats.name}' if stats is not None else ''}): {shorten_statement(statement)} "
+            f"parameters={redact_parameters(parameters, executemany)}"
+        )
+
+
+def instrument_queries(sync_engine: Engine = engine.sync_engine) -> None:
+    """
+    Track statements of an engine.
+    
+    Safe to call more than once.
+    
+    Args:
+        sync_engine: Synchronous engine behind the async engine
+    """
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,139 @@
+"""Per-user token-bucket rate limiting shared by the bot and the API.
+
+Buckets live in Redis and are updated atomically by a Lua script using the
+Redis server clock, so every process sees the same budget. Without Redis,
+each process keeps its own buckets, which only limits per process.
+
+Limits are written as "N/S": N requests per S seconds, with bursts of up
+to N. An empty limit or "0" disables limiting.
+"""
+import os
+import time
+from collections import Counter
+from typing import NamedTuple, Optional
+
+from redis.exceptions import RedisError
+
+from shared.lru import LRUCache
+from shared.redis_client import get_redis, mark_redis_failed
+
+KEY_PREFIX = "ratelimit:"
+
+# Refill the bucket for the time since the last call, then take the cost.
+# Returns the seconds to wait before the cost fits (0 if it was taken) as a
+# string, since Redis truncates Lua numbers to integers.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RateLimit(NamedTuple):
+    """Token bucket parameters."""
+    rate: float
+    burst: int
+
+
+def parse_rate_limit(spec: str) -> Optional[RateLimit]:
+    """
+    Parse a limit written as "N/S" (N requests per S seconds).
+
+    Args:
+        spec: Limit specification ("" or "0" for no limit)
+
+    Returns:
+        Optional[RateLimit]: Refill rate per second and bucket size, or None for no limit
+
+    Raises:
+        ValueError: If the specification is malformed
+    """
+    if spec.strip() in ("", "0"):
+        return None
+    count, _, seconds = spec.partition("/")
+    count, seconds = int(count), float(seconds or 1)
+    if count <= 0 or seconds <= 0:
+        raise ValueError(f"Invalid rate limit: {spec!r}")
+    return RateLimit(rate=count / seconds, burst=count)
+
+
+class RateLimiter:
+    """
+    Token buckets keyed by scope and user.
+
+    Counts rejected calls per scope for monitoring.
+    """
+
+    def __init__(self, local_maxsize: int) -> None:
+        """
+        Initialize limiter.
+
+        Args:
+            local_maxsize: Maximum number of buckets in the in-process fallback
+        """
+        # A missing entry is a full bucket, so expiry only matters for refill periods over an hour
+        self.local = LRUCache(maxsize=local_maxsize, ttl=3600)
+        self.rejected: Counter[str] = Counter()
+
+    async def acquire(self, scope: str, user_id: int, limit: RateLimit, cost: float = 1) -> float:
+        """
+        Take tokens from a user's bucket.
+
+        Args:
+            scope: Name of the limited operation
+            user_id: Telegram user ID
+            limit: Bucket parameters
+            cost: Tokens to take
+
+        Returns:
+            float: 0 if allowed, otherwise seconds until the call would be allowed
+        """
+        key = f"{KEY_PREFIX}{scope}:{user_id}"
+
+        redis = get_redis()
+        if redis is not None:
+            try:
+                wait = float(await redis.eval(TOKEN_BUCKET_SCRIPT, 1, key, limit.rate, limit.burst, cost))
+            except RedisError as e:
+                mark_redis_failed(e)
+                wait = self._acquire_local(key, limit, cost)
+        else:
+            wait = self._acquire_local(key, limit, cost)
+
+        if wait:
+            self.rejected[scope] += 1
+        return wait
+
+    def _acquire_local(self, key: str, limit: RateLimit, cost: float) -> float:
+        """Take tokens from an in-process bucket."""
+        now = time.monotonic()
+        tokens, last = self.local.get(key) or (limit.burst, now)
+        tokens = min(limit.burst, tokens + (now - last) * limit.rate)
+
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / limit.rate
+
+        self.local.set(key, (tokens, now))
+        return wait
+
+
+# Global limiter instance
+rate_limiter = RateLimiter(local_maxsize=int(os.getenv("RATE_LIMIT_LOCAL_SIZE", "10000")))
@@ -0,0 +1,67 @@
+"""Optional shared Redis connection used by caches across the bot and the API."""
+import logging
+import time
+from typing import Optional
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+# Seconds to stop using Redis after a connection error
+RETRY_AFTER = 30.0
+
+_redis: Optional[Redis] = None
+_disabled_until = 0.0
+
+
+def init_redis(redis_url: str) -> None:
+    """
+    Configure the shared Redis client.
+    
+    An empty URL leaves Redis disabled and callers fall back to in-process state.
+    
+    Args:
+        redis_url: Redis connection URL
+    """
+    global _redis
+    if not redis_url:
+        logger.info("Redis URL not set, using in-process caches only")
+        return
+    _redis = Redis.from_url(
+        redis_url,
+        socket_connect_timeout=1,
+        socket_timeout=1,
+    )
+
+
+def get_redis() -> Optional[Redis]:
+    """
+    Get the shared Redis client if it is configured and healthy.
+    
+    Returns:
+        Optional[Redis]: Redis client or None
+    """
+    if _redis is None or time.monotonic() < _disabled_until:
+        return None
+    return _redis
+
+
+def mark_redis_failed(error: Exception) -> None:
+    """
+    Temporarily stop using Redis after an error.
+    
+    Args:
+        error: Exception raised by the Redis client
+    """
+    global _disabled_until
+    if time.monotonic() >= _disabled_until:
+        logger.warning(f"Redis unavailable, falling back to in-process state for {RETRY_AFTER:.0f}s: {error}")
+    _disabled_until = time.monotonic() + RETRY_AFTER
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client."""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
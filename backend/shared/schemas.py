@@ -1,8 +1,8 @@
 """Shared Pydantic schemas for data validation and serialization."""
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, List, Literal, Optional, Union
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from database.models import TaskPriority, TaskStatus
 
@@ -73,3 +73,90 @@ class TaskStatsResponse(BaseModel):
     high_priority: int
     medium_priority: int
     low_priority: int
+
+
+# Batch Schemas
+class TaskBatchCreate(BaseModel):
+    """Batch operation creating a task."""
+    op: Literal["create"]
+    task: TaskCreate
+
+
+class TaskBatchUpdate(BaseModel):
+    """Batch operation updating a task."""
+    op: Literal["update"]
+    id: int
+    changes: TaskUpdate
+
+
+class TaskBatchDelete(BaseModel):
+    """Batch operation deleting a task."""
+    op: Literal["delete"]
+    id: int
+
+
+TaskBatchOperation = Annotated[
+    Union[TaskBatchCreate, TaskBatchUpdate, TaskBatchDelete],
+    Field(discriminator="op"),
+]
+
+
+class TaskBatchRequest(BaseModel):
+    """Schema for a batch of task operations applied in one transaction."""
+    operations: List[TaskBatchOperation] = Field(..., min_length=1, max_length=500)
+
+    @model_validator(mode="after")
+    def check_unique_ids(self) -> "TaskBatchRequest":
+        """Reject a task ID updated or deleted more than once, which would be counted twice."""
+        for op in ("update", "delete"):
+            seen = set()
+            for operation in self.operations:
+                if operation.op != op:
+                    continue
+                if operation.id in seen:
+                    raise ValueError(f"Task {operation.id} appears in more than one {op} operation")
+                seen.add(operation.id)
+        return self
+
+
+class TaskBatchResult(BaseModel):
+    """Schema for the result of one batch operation."""
+    index: int
+    op: str
+    id: Optional[int] = None
+    status: Literal["ok", "not_found"]
+    task: Optional[TaskResponse] = None
+
+
+class TaskBatchResponse(BaseModel):
+    """Schema for batch response, one result per operation in request order."""
+    results: List[TaskBatchResult]
+
+
+# Delta Sync Schema
+class TaskChangesResponse(BaseModel):
+    """Schema for tasks changed since a sync version."""
+    version: int
+    reset: bool = False
+    tasks: List[TaskResponse]
+    deleted: List[int]
+
+
+# Bootstrap Schema
+class BootstrapResponse(BaseModel):
+    """Schema for everything the Web App needs on startup."""
+    user: UserResponse
+    tasks: List[TaskResponse]
+    next_cursor: Optional[str] = None
+    stats: TaskStatsResponse
+    version: int
+
+
+# Auth Schemas
+class SessionResponse(BaseModel):
+    """Schema for session token response."""
+    token: str
+    token_type: str = "bearer"
+    expires_in: int
+    user_id: int
+    telegram_id: int
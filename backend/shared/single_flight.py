@@ -0,0 +1,98 @@
+"""Coalescing of identical concurrent reads within a process.
+
+While a read is in flight, callers asking for the same key wait for its
+result instead of running their own query. Results are shared between
+callers, so coalesced reads must return values that don't depend on the
+caller's session staying open (scalars, Pydantic models, or ORM objects
+whose attributes are already loaded) and that no caller mutates.
+
+A caller joining an in-flight read gets the same result it would have got
+by arriving a moment earlier; reads that must observe a write made after
+they were issued should not be coalesced. That includes anything a client
+reads back right after its own write, such as the data version, counters
+and change log; task lists are coalesced only per data version, which is
+read uncoalesced first.
+"""
+import asyncio
+from collections import Counter
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Share one in-flight call between concurrent callers with the same key.
+    
+    Keys are tuples whose first element names the read; calls and
+    executions are counted per name to report the coalescing ratio.
+    """
+    
+    def __init__(self) -> None:
+        """Initialize with no calls in flight."""
+        self.calls: Counter[str] = Counter()
+        self.executed: Counter[str] = Counter()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+    
+    async def do(self, key: tuple, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a call, or wait for an identical one already in flight.
+        
+        If the caller running the shared call is cancelled, waiting callers
+        retry rather than failing with it.
+        
+        Args:
+            key: Read name followed by its arguments
+            call: Coroutine function performing the read
+            
+        Returns:
+            T: Result of the call
+        """
+        name = key[0]
+        self.calls[name] += 1
+        
+        while (future := self._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+        
+        self.executed[name] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters re-raise it; don't warn about it otherwise
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+    
+    def stats(self) -> dict[str, dict]:
+        """
+        Get coalescing statistics per read.
+        
+        Returns:
+            dict[str, dict]: Calls, executed calls and share of calls coalesced by read name
+        """
+        return {
+            name: {
+                "calls": calls,
+                "executed": self.executed[name],
+                "coalesced_ratio": round(1 - self.executed[name] / calls, 4),
+            }
+            for name, calls in self.calls.items()
+        }
+
+
+# Global instance shared by the API and the bot
+single_flight = SingleFlight()
@@ -0,0 +1,154 @@
+"""Read-through cache of serialized task list responses.
+
+Entries are keyed by user, data version and filters, so a write
+invalidates every cached list of that user by moving the version forward.
+Readers take the version from the database (a primary key lookup on the
+user's counters row), never from the cache, so a write is visible as soon
+as it commits even if Redis missed it or was unavailable at the time.
+
+Without Redis, bodies are cached in process.
+"""
+import asyncio
+import os
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from redis.exceptions import RedisError
+
+from shared.lru import LRUCache
+from shared.redis_client import get_redis, mark_redis_failed
+from shared.single_flight import single_flight
+
+LIST_KEY_PREFIX = "tasks:list:"
+
+# Release a rebuild lock only if it is still ours
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class TaskListCache:
+    """
+    Cache of task list response bodies with stampede protection.
+    
+    Concurrent misses for the same key are coalesced in process (see
+    shared.single_flight), and across processes one rebuilder holds a short
+    Redis lock while the others wait for its result.
+    """
+    
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: int,
+        lock_timeout: float = 5.0,
+        lock_wait: float = 1.0,
+    ) -> None:
+        """
+        Initialize cache.
+        
+        Args:
+            maxsize: Maximum number of bodies in the in-process fallback
+            ttl: Lifetime of cached bodies in seconds
+            lock_timeout: Lifetime of a rebuild lock in seconds
+            lock_wait: How long to wait for another process's rebuild in seconds
+        """
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.lock_wait = lock_wait
+        self.hits = 0
+        self.misses = 0
+    
+    async def get_or_build(
+        self,
+        user_id: int,
+        version: int,
+        variant: str,
+        build: Callable[[], Awaitable[bytes]],
+    ) -> bytes:
+        """
+        Get a cached value or build and store it.
+        
+        Args:
+            user_id: Internal user ID
+            version: User's data version the value is built at
+            variant: Filters and page the value was built for
+            build: Coroutine function producing the value on a miss
+            
+        Returns:
+            bytes: Cached or freshly built value
+        """
+        key = f"{LIST_KEY_PREFIX}{user_id}:{version}:{variant}"
+        
+        value = await self._get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        
+        return await single_flight.do(("task_list", key), lambda: self._build(key, build))
+    
+    async def _build(self, key: str, build: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Build a value under the cross-process rebuild lock and store it."""
+        self.misses += 1
+        redis = get_redis()
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        locked = False
+        
+        if redis is not None:
+            try:
+                locked = await redis.set(lock_key, token, nx=True, px=int(self.lock_timeout * 1000))
+                if not locked:
+                    # Another process is building it; wait briefly for its result
+                    deadline = time.monotonic() + self.lock_wait
+                    while time.monotonic() < deadline:
+                        await asyncio.sleep(0.02)
+                        value = await redis.get(key)
+                        if value is not None:
+                            return value
+            except RedisError as e:
+                mark_redis_failed(e)
+        
+        try:
+            value = await build()
+            await self._set(key, value)
+            return value
+        finally:
+            if locked:
+                try:
+                    await redis.eval(RELEASE_SCRIPT, 1, lock_key, token)
+                except RedisError as e:
+                    mark_redis_failed(e)
+    
+    async def _get(self, key: str) -> Optional[bytes]:
+        """Get a value from Redis, or from the in-process tier without Redis."""
+        redis = get_redis()
+        if redis is None:
+            return self.local.get(key)
+        try:
+            return await redis.get(key)
+        except RedisError as e:
+            mark_redis_failed(e)
+            return self.local.get(key)
+    
+    async def _set(self, key: str, value: bytes) -> None:
+        """Store a value in Redis, or in the in-process tier without Redis."""
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.set(key, value, ex=self.ttl)
+                return
+            except RedisError as e:
+                mark_redis_failed(e)
+        self.local.set(key, value)
+
+
+# Global cache instance
+task_list_cache = TaskListCache(
+    maxsize=int(os.getenv("TASK_LIST_CACHE_SIZE", "1000")),
+    ttl=int(os.getenv("TASK_LIST_CACHE_TTL", "300")),
+)
@@ -0,0 +1,212 @@
+"""Task change notifications fanned out to open Mini App connections.
+
+Writers in the bot and the API publish to a per-user Redis channel after
+commit. Each API process holds one Redis subscription, subscribed only to
+the channels of users connected to it, and hands events to bounded
+per-connection queues. Without Redis, events are delivered within the
+publishing process only.
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable, Optional
+
+from redis.asyncio.client import PubSub
+from redis.exceptions import RedisError
+
+from shared.redis_client import RETRY_AFTER, get_redis, mark_redis_failed
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "tasks:user:"
+
+# Events buffered per connection before the oldest are dropped
+TASK_EVENTS_QUEUE_SIZE = int(os.getenv("TASK_EVENTS_QUEUE_SIZE", "32"))
+
+
+def task_event(version: int, changed: Iterable[int] = (), deleted: Iterable[int] = ()) -> dict:
+    """
+    Build a task change event.
+    
+    Args:
+        version: User's data version after the write
+        changed: IDs of created or updated tasks
+        deleted: IDs of deleted tasks
+        
+    Returns:
+        dict: Event payload
+    """
+    return {"type": "tasks_changed", "version": version, "changed": list(changed), "deleted": list(deleted)}
+
+
+class TaskEventHub:
+    """
+    Per-process fan-out of task change events to local subscribers.
+    
+    Events only tell the client which version to sync up to (see
+    GET /api/tasks/changes), so a slow subscriber losing older events to
+    back-pressure still converges on the latest one.
+    """
+    
+    def __init__(self, queue_size: int) -> None:
+        """
+        Initialize hub.
+        
+        Args:
+            queue_size: Maximum events buffered per subscriber
+        """
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._subscribers: dict[int, set[asyncio.Queue]] = defaultdict(set)
+        self._pubsub: Optional[PubSub] = None
+        self._reader: Optional[asyncio.Task] = None
+    
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[asyncio.Queue]:
+        """
+        Receive a user's task events for the duration of the context.
+        
+        Args:
+            user_id: Internal user ID
+            
+        Yields:
+            asyncio.Queue: Queue of event payloads
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        first = not self._subscribers[user_id]
+        self._subscribers[user_id].add(queue)
+        try:
+            if first:
+                await self._redis_subscribe(user_id)
+            yield queue
+        finally:
+            self._subscribers[user_id].discard(queue)
+            if not self._subscribers[user_id]:
+                del self._subscribers[user_id]
+                await self._redis_unsubscribe(user_id)
+    
+    def deliver(self, user_id: int, event: dict) -> None:
+        """
+        Hand an event to every local subscriber of a user.
+        
+        Args:
+            user_id: Internal user ID
+            event: Event payload
+        """
+        for queue in self._subscribers.get(user_id, ()):
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+    
+    @property
+    def connections(self) -> int:
+        """Number of local subscribers."""
+        return sum(len(queues) for queues in self._subscribers.values())
+    
+    async def _redis_subscribe(self, user_id: int) -> None:
+        """Subscribe to a user's channel, starting the reader if needed."""
+        # Without a connection the reader subscribes to every channel once it connects
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.subscribe(f"{CHANNEL_PREFIX}{user_id}")
+            except RedisError as e:
+                mark_redis_failed(e)
+                await self._reset_pubsub()
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read())
+    
+    async def _redis_unsubscribe(self, user_id: int) -> None:
+        """Unsubscribe from a user's channel."""
+        if self._pubsub is None:
+            return
+        try:
+            await self._pubsub.unsubscribe(f"{CHANNEL_PREFIX}{user_id}")
+        except RedisError as e:
+            mark_redis_failed(e)
+            await self._reset_pubsub()
+    
+    async def _read(self) -> None:
+        """Read published events and deliver them, resubscribing after Redis errors."""
+        while self._subscribers:
+            if self._pubsub is None:
+                redis = get_redis()
+                if redis is None:
+                    await asyncio.sleep(RETRY_AFTER)
+                    continue
+                self._pubsub = redis.pubsub(ignore_subscribe_messages=True)
+                try:
+                    await self._pubsub.subscribe(*(f"{CHANNEL_PREFIX}{user_id}" for user_id in self._subscribers))
+                except RedisError as e:
+                    mark_redis_failed(e)
+                    await self._reset_pubsub()
+                    continue
+            
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except (RedisError, OSError) as e:
+                mark_redis_failed(e)
+                await self._reset_pubsub()
+                continue
+            
+            if message is None or message["type"] != "message":
+                continue
+            try:
+                user_id = int(message["channel"].decode().removeprefix(CHANNEL_PREFIX))
+                self.deliver(user_id, json.loads(message["data"]))
+            except (ValueError, UnicodeDecodeError) as e:
+                logger.warning(f"Ignoring malformed task event: {e}")
+    
+    async def _reset_pubsub(self) -> None:
+        """Drop the current subscription connection."""
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except (RedisError, OSError):
+                pass
+            self._pubsub = None
+    
+    async def close(self) -> None:
+        """Stop the reader and close the subscription connection."""
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        await self._reset_pubsub()
+
+
+# Global hub instance
+task_event_hub = TaskEventHub(queue_size=TASK_EVENTS_QUEUE_SIZE)
+
+
+async def publish_task_event(
+    user_id: int,
+    version: int,
+    changed: Iterable[int] = (),
+    deleted: Iterable[int] = (),
+) -> None:
+    """
+    Notify a user's open connections that their tasks changed.
+    
+    Call after commit. Failures are logged and otherwise ignored; clients
+    also resync when they reconnect.
+    
+    Args:
+        user_id: Internal user ID
+        version: User's data version after the write
+        changed: IDs of created or updated tasks
+        deleted: IDs of deleted tasks
+    """
+    event = task_event(version, changed, deleted)
+    
+    redis = get_redis()
+    if redis is not None:
+        try:
+            await redis.publish(f"{CHANNEL_PREFIX}{user_id}", json.dumps(event, separators=(",", ":")))
+            return
+        except RedisError as e:
+            mark_redis_failed(e)
+    
+    task_event_hub.deliver(user_id, event)
@@ -0,0 +1,430 @@
+"""Lightweight tracing for API requests, bot updates and their I/O.
+
+Spans form a tree per trace: an API request or bot update at the root,
+with middlewares, handlers, SQL statements, pool checkouts and Bot API
+calls below it. The current span lives in a context variable, so it
+follows the request into the tasks it awaits, and into SQLAlchemy's
+event hooks. Webhook updates are fed to the dispatcher within the
+request, so their spans are children of the POST /webhook span. Incoming
+W3C traceparent headers continue the caller's trace ID; whether the trace
+is recorded is still decided locally, since clients can send any flags,
+unless TRACE_TRUST_PARENT is set (e.g. behind a proxy that sets them).
+
+A TRACE_SAMPLE_RATE share of traces is recorded (0 disables tracing);
+finished spans are appended to the JSONL file TRACE_FILE by a background
+thread, one JSON object per line, so tracing works without a collector.
+When the file reaches TRACE_FILE_MAX_MB it is moved to TRACE_FILE.1,
+replacing the previous one, and a new file is started.
+"""
+import atexit
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, NamedTuple, Optional
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from database import engine, pool_stats
+from shared.metrics import sql_operation
+from shared.query_stats import shorten_statement
+
+logger = logging.getLogger(__name__)
+
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACE_FILE_MAX_MB = float(os.getenv("TRACE_FILE_MAX_MB", "100"))  # 0 lets the file grow without limit
+TRACE_TRUST_PARENT = os.getenv("TRACE_TRUST_PARENT", "false").lower() == "true"
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class SpanContext(NamedTuple):
+    """Identity of a span, as carried by a traceparent header."""
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[SpanContext]:
+    """
+    Parse a W3C traceparent header.
+    
+    Args:
+        header: Header value
+        
+    Returns:
+        Optional[SpanContext]: Remote parent, or None if missing or malformed
+    """
+    match = TRACEPARENT_PATTERN.match(header.strip().lower()) if header else None
+    if match is None:
+        return None
+    trace_id, span_id, flags = match.groups()
+    return SpanContext(trace_id, span_id, bool(int(flags, 16) & 1))
+
+
+class Span:
+    """A timed operation within a trace."""
+    
+    __slots__ = ("name", "context", "parent_id", "kind", "attributes", "error", "start", "_started", "_tracer")
+    
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        context: SpanContext,
+        parent_id: Optional[str],
+        kind: str,
+        attributes: Optional[dict],
+    ) -> None:
+        self._tracer = tracer
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+        self.start = time.time()
+        self._started = time.perf_counter()
+    
+    @property
+    def sampled(self) -> bool:
+        """Whether the span is recorded."""
+        return self.context.sampled
+    
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header continuing the trace below this span."""
+        return f"00-{self.context.trace_id}-{self.context.span_id}-{'01' if self.sampled else '00'}"
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        """
+        Attach a value to the span.
+        
+        Args:
+            key: Attribute name
+            value: JSON-serializable value
+        """
+        self.attributes[key] = value
+    
+    def record_error(self, error: BaseException) -> None:
+        """
+        Mark the span as failed.
+        
+        Args:
+            error: Exception that ended the operation
+        """
+        self.error = f"{type(error).__name__}: {error}"
+    
+    def end(self, duration: Optional[float] = None) -> None:
+        """
+        Finish the span and export it if sampled.
+        
+        Args:
+            duration: Seconds the operation took (defaults to the time since the span started)
+        """
+        if not self.sampled:
+            return
+        if duration is None:
+            duration = time.perf_counter() - self._started
+        self._tracer.export({
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": round(self.start, 6),
+            "duration_ms": round(duration * 1000, 3),
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+        })
+
+
+class JsonlSpanExporter:
+    """
+    Append finished spans to a JSONL file from a background thread.
+    
+    Spans waiting to be written are written in batches, each with a single
+    write, so processes sharing the file never interleave partial lines.
+    A file that reached max_bytes is rotated to <path>.1.
+    """
+    
+    def __init__(self, path: str, max_bytes: int = 0) -> None:
+        """
+        Initialize exporter; the thread starts with the first span.
+        
+        Args:
+            path: File to append spans to
+            max_bytes: Size at which the file is rotated (0 never rotates)
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def export(self, span: dict) -> None:
+        """
+        Queue a finished span for writing.
+        
+        Args:
+            span: Span as a JSON-serializable dict
+        """
+        if self._thread is None:
+            self._start()
+        self._queue.put(span)
+    
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+    
+    def _run(self) -> None:
+        file = open(self.path, "ab", buffering=0)
+        try:
+            while True:
+                span = self._queue.get()
+                batch = []
+                while span is not None:
+                    batch.append(orjson.dumps(span, default=str))
+                    try:
+                        span = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if batch:
+                    try:
+                        file.write(b"\n".join(batch) + b"\n")
+                        if self.max_bytes and file.tell() >= self.max_bytes:
+                            file = self._rotate(file)
+                    except OSError as e:
+                        logger.warning(f"Failed to write spans to {self.path}: {e}")
+                if span is None:
+                    return
+        finally:
+            file.close()
+    
+    def _rotate(self, file):
+        """Move the full file to <path>.1 and continue in a new one."""
+        try:
+            # Another process appending to the same file may have rotated it already
+            if os.stat(self.path).st_ino == os.fstat(file.fileno()).st_ino:
+                os.replace(self.path, f"{self.path}.1")
+        except FileNotFoundError:
+            pass
+        new_file = open(self.path, "ab", buffering=0)
+        file.close()
+        return new_file
+    
+    def close(self, timeout: float = 2.0) -> None:
+        """
+        Write queued spans and stop the thread.
+        
+        Args:
+            timeout: Seconds to wait for the spans to be written
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Creates spans and decides which traces are sampled."""
+    
+    def __init__(
+        self,
+        sample_rate: float,
+        exporter: Optional[JsonlSpanExporter],
+        trust_parent: bool = False,
+    ) -> None:
+        """
+        Initialize tracer.
+        
+        Args:
+            sample_rate: Share of new traces to record (0 to 1)
+            exporter: Destination of finished spans (None records nothing)
+            trust_parent: Follow the sampled flag of remote parents instead of sampling locally
+        """
+        self.sample_rate = sample_rate if exporter is not None else 0.0
+        self.exporter = exporter
+        self.trust_parent = trust_parent
+    
+    def _sample(self) -> bool:
+        """Decide whether a new trace is recorded."""
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+    
+    def export(self, span: dict) -> None:
+        """Hand a finished span to the exporter."""
+        if self.exporter is not None:
+            self.exporter.export(span)
+    
+    def current_span(self) -> Optional[Span]:
+        """
+        Get the span of the operation in progress.
+        
+        Returns:
+            Optional[Span]: Current span, or None outside traced operations
+        """
+        return _current.get()
+    
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        attributes: Optional[dict] = None,
+        parent: Optional[SpanContext] = None,
+    ) -> Span:
+        """
+        Start a span below the given or current span, or a new trace.
+        
+        The span does not become current; end it with Span.end(). Spans
+        below a remote parent keep its trace ID but are sampled locally,
+        unless the tracer trusts remote parents.
+        
+        Args:
+            name: Operation name
+            kind: "server", "consumer", "client" or "internal"
+            attributes: Initial attributes
+            parent: Remote parent (defaults to the current span)
+            
+        Returns:
+            Span: Started span, unsampled when its trace is not recorded
+        """
+        span_id = f"{random.getrandbits(64):016x}"
+        if parent is not None:
+            sampled = parent.sampled and self.exporter is not None if self.trust_parent else self._sample()
+            context = SpanContext(parent.trace_id, span_id, sampled)
+            return Span(self, name, context, parent.span_id, kind, attributes)
+        
+        current = _current.get()
+        if current is not None:
+            context = SpanContext(current.context.trace_id, span_id, current.sampled)
+            return Span(self, name, context, current.context.span_id, kind, attributes)
+        
+        context = SpanContext(f"{random.getrandbits(128):032x}", span_id, self._sample())
+        return Span(self, name, context, None, kind, attributes)
+    
+    def start_child(self, name: str, kind: str = "internal", attributes: Optional[dict] = None) -> Optional[Span]:
+        """
+        Start a span only if a recorded trace is in progress.
+        
+        Used for frequent operations (statements, API calls) that are not
+        worth a trace of their own.
+        
+        Args:
+            name: Operation name
+            kind: "server", "consumer", "client" or "internal"
+            attributes: Initial attributes
+            
+        Returns:
+            Optional[Span]: Started span, or None outside recorded traces
+        """
+        current = _current.get()
+        if current is None or not current.sampled:
+            return None
+        return self.start_span(name, kind, attributes)
+    
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: str = "internal",
+        attributes: Optional[dict] = None,
+        parent: Optional[SpanContext] = None,
+    ) -> Iterator[Span]:
+        """
+        Run a block in a new current span, recording exceptions raised in it.
+        
+        Args:
+            name: Operation name
+            kind: "server", "consumer", "client" or "internal"
+            attributes: Initial attributes
+            parent: Remote parent (defaults to the current span)
+            
+        Yields:
+            Span: The span, to add attributes to
+        """
+        span = self.start_span(name, kind, attributes, parent)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current.reset(token)
+            span.end()
+    
+    def record(self, name: str, duration: float, attributes: Optional[dict] = None) -> None:
+        """
+        Record an operation that just finished as a child of the current span.
+        
+        Args:
+            name: Operation name
+            duration: Seconds the operation took
+            attributes: Attributes
+        """
+        span = self.start_child(name, attributes=attributes)
+        if span is not None:
+            span.start -= duration
+            span.end(duration)
+
+
+# Global tracer shared by the API and the bot
+tracer = Tracer(
+    TRACE_SAMPLE_RATE,
+    JsonlSpanExporter(TRACE_FILE, int(TRACE_FILE_MAX_MB * 1024 * 1024)) if TRACE_SAMPLE_RATE > 0 else None,
+    TRACE_TRUST_PARENT,
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._trace_span = tracer.start_child(
+        "db.query",
+        "client",
+        {"db.operation": sql_operation(statement), "db.statement": shorten_statement(statement)},
+    )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        span.end()
+
+
+def _handle_error(exception_context) -> None:
+    span = getattr(exception_context.execution_context, "_trace_span", None)
+    if span is not None:
+        span.record_error(exception_context.original_exception)
+        span.end()
+
+
+def trace_database(sync_engine: Engine = engine.sync_engine) -> None:
+    """
+    Record statements and pool checkouts of an engine as spans.
+    
+    Safe to call more than once.
+    
+    Args:
+        sync_engine: Synchronous engine behind the async engine
+    """
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+    
+    pool_stats.observers.append(lambda seconds: tracer.record("db.pool_checkout", seconds))
@@ -0,0 +1,116 @@
+"""Cached telegram_id → users.id resolution shared by the bot and the API."""
+import logging
+import os
+from typing import Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import User
+from shared.lru import LRUCache
+from shared.redis_client import get_redis, mark_redis_failed
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "user_id:tg:"
+
+
+class UserResolver:
+    """
+    Resolve Telegram IDs to internal user IDs.
+    
+    Lookups go through an in-process LRU, then Redis (when configured),
+    then the users table. Only hits are cached: a missing user is looked
+    up again next time so /start takes effect immediately.
+    """
+    
+    def __init__(self, maxsize: int, local_ttl: float, redis_ttl: int) -> None:
+        """
+        Initialize resolver.
+        
+        Args:
+            maxsize: Maximum number of entries in the in-process tier
+            local_ttl: Lifetime of in-process entries in seconds
+            redis_ttl: Lifetime of Redis entries in seconds
+        """
+        self.local = LRUCache(maxsize=maxsize, ttl=local_ttl)
+        self.redis_ttl = redis_ttl
+    
+    def peek(self, telegram_id: int) -> Optional[int]:
+        """
+        Get a cached user ID from the in-process tier without any I/O.
+        
+        Args:
+            telegram_id: Telegram user ID
+            
+        Returns:
+            Optional[int]: Internal user ID or None if not cached
+        """
+        return self.local.get(telegram_id)
+    
+    async def resolve(self, session: AsyncSession, telegram_id: int) -> Optional[int]:
+        """
+        Resolve a Telegram ID to an internal user ID.
+        
+        Args:
+            session: Database session
+            telegram_id: Telegram user ID
+            
+        Returns:
+            Optional[int]: Internal user ID or None if the user doesn't exist
+        """
+        user_id = self.local.get(telegram_id)
+        if user_id is not None:
+            return user_id
+        
+        redis = get_redis()
+        if redis is not None:
+            try:
+                cached = await redis.get(f"{REDIS_KEY_PREFIX}{telegram_id}")
+                if cached is not None:
+                    user_id = int(cached)
+                    self.local.set(telegram_id, user_id)
+                    return user_id
+            except RedisError as e:
+                mark_redis_failed(e)
+        
+        result = await session.execute(
+            select(User.id).where(User.telegram_id == telegram_id)
+        )
+        user_id = result.scalar_one_or_none()
+        if user_id is None:
+            return None
+        
+        self.local.set(telegram_id, user_id)
+        if redis is not None:
+            try:
+                await redis.set(f"{REDIS_KEY_PREFIX}{telegram_id}", user_id, ex=self.redis_ttl)
+            except RedisError as e:
+                mark_redis_failed(e)
+        
+        return user_id
+    
+    async def invalidate(self, telegram_id: int) -> None:
+        """
+        Drop a Telegram ID from both tiers.
+        
+        Args:
+            telegram_id: Telegram user ID
+        """
+        self.local.pop(telegram_id)
+        
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.delete(f"{REDIS_KEY_PREFIX}{telegram_id}")
+            except RedisError as e:
+                mark_redis_failed(e)
+
+
+# Global resolver instance
+user_resolver = UserResolver(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "10000")),
+    local_ttl=float(os.getenv("USER_CACHE_LOCAL_TTL", "300")),
+    redis_ttl=int(os.getenv("USER_CACHE_REDIS_TTL", "86400")),
+)
@@ -0,0 +1,41 @@
+"""Validation of POST /api/tasks/batch request bodies."""
+import pytest
+from pydantic import ValidationError
+
+from shared.schemas import TaskBatchRequest
+
+
+def test_duplicate_update_is_rejected() -> None:
+    operations = [
+        {"op": "update", "id": 5, "changes": {"status": "done"}},
+        {"op": "update", "id": 5, "changes": {"status": "done"}},
+    ]
+    with pytest.raises(ValidationError, match="Task 5 appears in more than one update operation"):
+        TaskBatchRequest.model_validate({"operations": operations})
+
+
+def test_duplicate_update_with_different_changes_is_rejected() -> None:
+    operations = [
+        {"op": "update", "id": 5, "changes": {"status": "done"}},
+        {"op": "update", "id": 5, "changes": {"priority": "high"}},
+    ]
+    with pytest.raises(ValidationError):
+        TaskBatchRequest.model_validate({"operations": operations})
+
+
+def test_duplicate_delete_is_rejected() -> None:
+    operations = [{"op": "delete", "id": 7}, {"op": "delete", "id": 7}]
+    with pytest.raises(ValidationError, match="Task 7 appears in more than one delete operation"):
+        TaskBatchRequest.model_validate({"operations": operations})
+
+
+def test_update_and_delete_of_the_same_task_are_allowed() -> None:
+    operations = [
+        {"op": "create", "task": {"title": "first"}},
+        {"op": "create", "task": {"title": "first"}},
+        {"op": "update", "id": 5, "changes": {"status": "done"}},
+        {"op": "update", "id": 6, "changes": {"status": "done"}},
+        {"op": "delete", "id": 5},
+    ]
+    batch = TaskBatchRequest.model_validate({"operations": operations})
+    assert [op.op for op in batch.operations] == ["create", "create", "update", "update", "delete"]
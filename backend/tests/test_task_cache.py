@@ -0,0 +1,36 @@
+"""Task list cache behaviour without Redis."""
+import asyncio
+
+from shared.task_cache import TaskListCache
+
+
+def test_new_version_rebuilds_cached_list() -> None:
+    cache = TaskListCache(maxsize=10, ttl=60)
+    builds = []
+    
+    async def build() -> bytes:
+        builds.append(1)
+        return f"body {len(builds)}".encode()
+    
+    async def scenario() -> list[bytes]:
+        return [
+            await cache.get_or_build(1, 1, "json", build),
+            await cache.get_or_build(1, 1, "json", build),
+            await cache.get_or_build(1, 2, "json", build),
+        ]
+    
+    assert asyncio.run(scenario()) == [b"body 1", b"body 1", b"body 2"]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_variants_are_cached_separately() -> None:
+    cache = TaskListCache(maxsize=10, ttl=60)
+    
+    async def scenario() -> list[bytes]:
+        return [
+            await cache.get_or_build(1, 1, "json", lambda: asyncio.sleep(0, b"json")),
+            await cache.get_or_build(1, 1, "msgpack", lambda: asyncio.sleep(0, b"msgpack")),
+            await cache.get_or_build(2, 1, "json", lambda: asyncio.sleep(0, b"other user")),
+        ]
+    
+    assert asyncio.run(scenario()) == [b"json", b"msgpack", b"other user"]
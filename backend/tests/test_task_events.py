@@ -0,0 +1,37 @@
+"""Authentication of the task events WebSocket."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from api.auth import create_session_token
+from api.config import config
+from api.routers import tasks
+
+app = FastAPI()
+app.include_router(tasks.router)
+
+
+def test_token_in_first_message_subscribes(monkeypatch) -> None:
+    monkeypatch.setattr(config, "task_events_heartbeat", 0.05)
+    token, _ = create_session_token(user_id=42, telegram_id=1042)
+    with TestClient(app) as client, client.websocket_connect("/api/tasks/events") as websocket:
+        websocket.send_json({"type": "auth", "token": token})
+        assert websocket.receive_json() == {"type": "ping"}
+
+
+@pytest.mark.parametrize("message", [{"type": "auth", "token": "forged"}, {"type": "auth"}, ["token"]])
+def test_invalid_first_message_closes_with_policy_violation(message) -> None:
+    with TestClient(app) as client, client.websocket_connect("/api/tasks/events") as websocket:
+        websocket.send_json(message)
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+    assert closed.value.code == 1008
+
+
+def test_missing_token_times_out(monkeypatch) -> None:
+    monkeypatch.setattr(config, "task_events_auth_timeout", 0.05)
+    with TestClient(app) as client, client.websocket_connect("/api/tasks/events") as websocket:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+    assert closed.value.code == 1008
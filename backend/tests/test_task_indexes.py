@@ -0,0 +1,106 @@
+"""The planner uses the task indexes from migration 3f9c2a1d7b40 for the hot task queries."""
+import asyncio
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from api.routers.tasks import TASK_COLUMNS, build_task_list_query
+from bot.handlers.tasks import build_active_tasks_query
+from database.models import Base, TaskPriority, TaskStatus
+
+USERS = 200
+TASKS_PER_USER = 250
+
+
+async def prepare_database(url: str) -> None:
+    """Create the pre-migration schema and seed it with tasks."""
+    engine = create_async_engine(url, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        # Tables as the application created them before the migration
+        for name in ("ix_tasks_user_created", "ix_tasks_user_status_priority_created", "ix_tasks_user_active_priority"):
+            await conn.execute(text(f"DROP INDEX {name}"))
+        await conn.execute(text("CREATE INDEX ix_tasks_user_id ON tasks (user_id)"))
+        
+        await conn.execute(text(
+            "INSERT INTO users (telegram_id, first_name) "
+            "SELECT 1000 + n, 'user ' || n FROM generate_series(1, :users) AS n"
+        ), {"users": USERS})
+        await conn.execute(text(
+            "INSERT INTO tasks (user_id, title, status, priority, created_at, updated_at) "
+            "SELECT u.id, 'task ' || n, "
+            "(ARRAY['TODO', 'IN_PROGRESS', 'DONE'])[1 + n % 3], "
+            "(ARRAY['LOW', 'MEDIUM', 'HIGH'])[1 + (n / 3) % 3], "
+            "now() - n * interval '1 minute', now() "
+            "FROM users AS u CROSS JOIN generate_series(1, :tasks) AS n"
+        ), {"tasks": TASKS_PER_USER})
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE"))
+    await engine.dispose()
+
+
+async def explain(url: str, query) -> str:
+    """Get the text plan of a query."""
+    sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    engine = create_async_engine(url, poolclass=NullPool)
+    async with engine.connect() as conn:
+        result = await conn.execute(text(f"EXPLAIN {sql}"))
+        plan = "\n".join(row[0] for row in result)
+    await engine.dispose()
+    return plan
+
+
+@pytest.fixture(scope="module")
+def monkeypatch_module():
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        yield monkeypatch
+
+
+@pytest.fixture(scope="module")
+def migrated_database(database_url: str, monkeypatch_module) -> str:
+    """Seed the test database and run the migrations on it."""
+    asyncio.run(prepare_database(database_url))
+    monkeypatch_module.setenv("DATABASE_URL", database_url)
+    command.upgrade(Config("alembic.ini"), "head")
+    return database_url
+
+
+def test_migration_replaces_user_id_index(migrated_database: str) -> None:
+    async def index_names() -> set[str]:
+        engine = create_async_engine(migrated_database, poolclass=NullPool)
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT indexname FROM pg_indexes WHERE tablename = 'tasks'"))
+            names = set(result.scalars())
+        await engine.dispose()
+        return names
+    
+    names = asyncio.run(index_names())
+    assert {"ix_tasks_user_created", "ix_tasks_user_status_priority_created", "ix_tasks_user_active_priority"} <= names
+    assert "ix_tasks_user_id" not in names
+
+
+def test_task_list_uses_user_created_index(migrated_database: str) -> None:
+    query = build_task_list_query(USERS // 2, limit=50, columns=TASK_COLUMNS)
+    plan = asyncio.run(explain(migrated_database, query))
+    assert "ix_tasks_user_created" in plan, plan
+
+
+def test_filtered_task_list_uses_status_priority_index(migrated_database: str) -> None:
+    query = build_task_list_query(
+        USERS // 2, TaskStatus.IN_PROGRESS, TaskPriority.HIGH, limit=50, columns=TASK_COLUMNS
+    )
+    plan = asyncio.run(explain(migrated_database, query))
+    assert "ix_tasks_user_status_priority_created" in plan, plan
+
+
+def test_active_tasks_use_partial_index(migrated_database: str) -> None:
+    plan = asyncio.run(explain(migrated_database, build_active_tasks_query(USERS // 2)))
+    assert "ix_tasks_user_active_priority" in plan, plan
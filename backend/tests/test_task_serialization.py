@@ -0,0 +1,66 @@
+"""encode_task_rows produces exactly the JSON Pydantic would for List[TaskResponse]."""
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+from api.routers.tasks import TASK_FIELDS, encode_task_rows
+from database.models import TaskPriority, TaskStatus
+from shared.schemas import TaskResponse
+
+TaskRow = namedtuple("TaskRow", TASK_FIELDS)
+
+CREATED = datetime(2026, 10, 16, 20, 45, tzinfo=timezone.utc)
+
+
+def task_row(**fields) -> TaskRow:
+    """Build a row like the database returns, with UTC datetimes."""
+    values = {
+        "title": "Task",
+        "description": None,
+        "priority": TaskPriority.MEDIUM,
+        "deadline": None,
+        "id": 1,
+        "user_id": 7,
+        "status": TaskStatus.TODO,
+        "created_at": CREATED,
+        "updated_at": CREATED,
+    }
+    values.update(fields)
+    return TaskRow(**values)
+
+
+ROWS = [
+    task_row(),
+    task_row(
+        id=2,
+        title="Купить молоко 🥛",
+        description="Описание — «с кавычками» и \"escapes\"\n\ttabs \\ slashes",
+        priority=TaskPriority.HIGH,
+        status=TaskStatus.IN_PROGRESS,
+        deadline=CREATED + timedelta(days=3),
+        updated_at=CREATED + timedelta(microseconds=123456),
+    ),
+    task_row(
+        id=3,
+        title="日本語のタスク",
+        description="",
+        priority=TaskPriority.LOW,
+        status=TaskStatus.DONE,
+        deadline=CREATED + timedelta(hours=1, microseconds=500),
+        created_at=CREATED + timedelta(seconds=1, microseconds=100000),
+        updated_at=CREATED + timedelta(seconds=2, microseconds=1),
+    ),
+]
+
+
+def pydantic_json(rows) -> bytes:
+    adapter = TypeAdapter(List[TaskResponse])
+    return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+
+@pytest.mark.parametrize("rows", [[], ROWS[:1], ROWS[1:2], ROWS[2:], ROWS], ids=["empty", "nulls", "unicode", "fractions", "all"])
+def test_matches_pydantic_byte_for_byte(rows) -> None:
+    assert encode_task_rows(rows) == pydantic_json(rows)
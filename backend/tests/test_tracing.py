@@ -0,0 +1,56 @@
+"""Trace sampling of remote parents and rotation of the trace file."""
+import json
+import time
+
+from shared.tracing import JsonlSpanExporter, SpanContext, Tracer, parse_traceparent
+
+SAMPLED_PARENT = parse_traceparent("00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01")
+
+
+class ListExporter:
+    """Collects exported spans in memory."""
+    
+    def __init__(self) -> None:
+        self.spans = []
+    
+    def export(self, span: dict) -> None:
+        self.spans.append(span)
+
+
+def test_remote_sampled_flag_is_ignored_by_default() -> None:
+    tracer = Tracer(sample_rate=0.000001, exporter=ListExporter())
+    spans = [tracer.start_span("GET /api/tasks", "server", parent=SAMPLED_PARENT) for _ in range(100)]
+    assert not any(span.sampled for span in spans)
+    assert {span.context.trace_id for span in spans} == {SAMPLED_PARENT.trace_id}
+
+
+def test_remote_sampled_flag_is_followed_when_trusted() -> None:
+    tracer = Tracer(sample_rate=0.000001, exporter=ListExporter(), trust_parent=True)
+    assert tracer.start_span("GET /api/tasks", "server", parent=SAMPLED_PARENT).sampled
+    unsampled = SpanContext(SAMPLED_PARENT.trace_id, SAMPLED_PARENT.span_id, False)
+    assert not tracer.start_span("GET /api/tasks", "server", parent=unsampled).sampled
+
+
+def test_children_follow_the_local_decision() -> None:
+    tracer = Tracer(sample_rate=1.0, exporter=ListExporter())
+    with tracer.span("GET /api/tasks", "server", parent=SAMPLED_PARENT) as root:
+        child = tracer.start_child("db.query", "client")
+    assert root.sampled and child.sampled
+    assert child.parent_id == root.context.span_id
+
+
+def test_exporter_rotates_full_file(tmp_path) -> None:
+    path = tmp_path / "traces.jsonl"
+    exporter = JsonlSpanExporter(str(path), max_bytes=200)
+    for index in range(20):
+        exporter.export({"name": "span", "index": index, "padding": "x" * 40})
+        # Let each span be written on its own
+        time.sleep(0.01)
+    exporter.close()
+    
+    rotated = tmp_path / "traces.jsonl.1"
+    assert rotated.exists()
+    assert rotated.stat().st_size < 400
+    assert path.stat().st_size < 400
+    indexes = [json.loads(line)["index"] for line in (rotated.read_text() + path.read_text()).splitlines()]
+    assert indexes == sorted(indexes) and indexes[-1] == 19
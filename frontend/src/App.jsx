@@ -1,11 +1,24 @@
 /**
  * App component - Main application component
  */
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import './styles/App.css';
 import TaskList from './components/TaskList';
 import AddTask from './components/AddTask';
-import { tasksAPI } from './services/api';
+import { subscribeToTaskEvents, tasksAPI } from './services/api';
+
+// Tasks per page: the first page comes with the startup data, the rest load in the background
+const PAGE_SIZE = 50;
+
+// Newest first, like the task list endpoint
+const byNewest = (a, b) => Date.parse(b.created_at) - Date.parse(a.created_at) || b.id - a.id;
+
+// Replace tasks by id and add new ones, keeping the list newest first
+const mergeTasks = (current, incoming) => {
+  const incomingById = new Map(incoming.map((task) => [task.id, task]));
+  const kept = current.filter((task) => !incomingById.has(task.id));
+  return [...kept, ...incoming].sort(byNewest);
+};
 
 function App() {
   const [tasks, setTasks] = useState([]);
@@ -13,6 +26,10 @@ function App() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [showAddTask, setShowAddTask] = useState(false);
+  const fetchGeneration = useRef(0);
+  // Data version the local copy reflects, and the sync in flight (if any)
+  const version = useRef(0);
+  const syncing = useRef(null);
 
   // Initialize Telegram Web App
   useEffect(() => {
@@ -42,25 +59,30 @@ function App() {
   }, []);
 
   // Fetch tasks and stats
-  const fetchData = async () => {
+  const fetchData = async (showLoading = true) => {
     try {
-      setLoading(true);
+      if (showLoading) {
+        setLoading(true);
+      }
       setError(null);
       
       console.log('[App] Fetching tasks and stats...');
       
-      const [tasksResponse, statsResponse] = await Promise.all([
-        tasksAPI.getTasks(),
-        tasksAPI.getStats(),
-      ]);
+      const generation = ++fetchGeneration.current;
+      const { data } = await tasksAPI.bootstrap(PAGE_SIZE);
       
-      setTasks(tasksResponse.data);
-      setStats(statsResponse.data);
+      version.current = data.version;
+      setTasks(data.tasks);
+      setStats(data.stats);
       
       console.log('[App] ✓ Data loaded successfully:', {
-        tasksCount: tasksResponse.data.length,
-        stats: statsResponse.data
+        tasksCount: data.tasks.length,
+        stats: data.stats
       });
+      
+      if (data.next_cursor) {
+        loadRemainingTasks(data.next_cursor, generation);
+      }
     } catch (err) {
       console.error('[App] ✗ Error fetching data:', err);
       
@@ -87,10 +109,66 @@ function App() {
     }
   };
 
+  // Append the pages after the first, unless a newer fetch has started meanwhile
+  const loadRemainingTasks = async (cursor, generation) => {
+    try {
+      while (cursor) {
+        const response = await tasksAPI.getTasks({ limit: PAGE_SIZE, cursor });
+        if (generation !== fetchGeneration.current) {
+          return;
+        }
+        setTasks((current) => mergeTasks(current, response.data));
+        cursor = response.headers['x-next-cursor'];
+      }
+    } catch (err) {
+      console.error('[App] ✗ Error loading more tasks:', err);
+    }
+  };
+
+  // Apply changes made since the local version, unless it already reaches targetVersion
+  const syncChanges = async (targetVersion = Infinity) => {
+    // A sync already in flight may cover this change
+    while (syncing.current) {
+      await syncing.current;
+    }
+    if (targetVersion <= version.current) {
+      return;
+    }
+    
+    syncing.current = (async () => {
+      try {
+        const [changes, statsResponse] = await Promise.all([
+          tasksAPI.getTaskChanges(version.current),
+          tasksAPI.getStats(),
+        ]);
+        const { data } = changes;
+        
+        if (data.reset) {
+          setTasks([...data.tasks].sort(byNewest));
+        } else {
+          const deleted = new Set(data.deleted);
+          setTasks((current) => mergeTasks(current.filter((task) => !deleted.has(task.id)), data.tasks));
+        }
+        setStats(statsResponse.data);
+        version.current = Math.max(version.current, data.version);
+      } catch (err) {
+        console.error('[App] ✗ Error syncing task changes:', err);
+      } finally {
+        syncing.current = null;
+      }
+    })();
+    await syncing.current;
+  };
+
   useEffect(() => {
     fetchData();
   }, []);
 
+  // Catch up when tasks change elsewhere (e.g. from the bot); echoes of our own writes are skipped
+  useEffect(() => {
+    return subscribeToTaskEvents((event) => syncChanges(event.version));
+  }, []);
+
   // Handle task creation
   const handleCreateTask = async (taskData) => {
     try {
@@ -103,8 +181,8 @@ function App() {
         tg.HapticFeedback?.notificationOccurred('success');
       }
       
-      // Refresh data
-      await fetchData();
+      // Apply the change and any others since the last sync
+      await syncChanges();
     } catch (err) {
       console.error('Error creating task:', err);
       
@@ -127,8 +205,8 @@ function App() {
         tg.HapticFeedback?.notificationOccurred('success');
       }
       
-      // Refresh data
-      await fetchData();
+      // Apply the change and any others since the last sync
+      await syncChanges();
     } catch (err) {
       console.error('Error updating task:', err);
       
@@ -151,8 +229,8 @@ function App() {
         tg.HapticFeedback?.notificationOccurred('success');
       }
       
-      // Refresh data
-      await fetchData();
+      // Apply the change and any others since the last sync
+      await syncChanges();
     } catch (err) {
       console.error('Error deleting task:', err);
       
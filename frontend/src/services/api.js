@@ -19,14 +19,54 @@ const api = axios.create({
   },
 });
 
-// Add request interceptor to include Telegram initData
+// Session token obtained by exchanging initData once
+let sessionToken = null;
+let sessionExpiresAt = 0;
+let sessionPromise = null;
+
+/**
+ * Get a valid session token, exchanging initData for a new one when needed
+ * @returns {Promise<string|null>} Session token or null if exchange failed
+ */
+const getSessionToken = () => {
+  // Refresh a little before expiry to avoid racing the server clock
+  if (sessionToken && Date.now() < sessionExpiresAt - 30000) {
+    return Promise.resolve(sessionToken);
+  }
+
+  if (!sessionPromise) {
+    sessionPromise = axios
+      .post(`${API_URL}/api/auth/session`, null, {
+        headers: { Authorization: window.Telegram.WebApp.initData },
+      })
+      .then((response) => {
+        sessionToken = response.data.token;
+        sessionExpiresAt = Date.now() + response.data.expires_in * 1000;
+        console.log('[API Service] ✓ Session token obtained');
+        return sessionToken;
+      })
+      .catch((error) => {
+        console.warn('[API Service] ⚠️ Session exchange failed, falling back to initData:', error.message);
+        sessionToken = null;
+        return null;
+      })
+      .finally(() => {
+        sessionPromise = null;
+      });
+  }
+
+  return sessionPromise;
+};
+
+// Add request interceptor to include session token or Telegram initData
 api.interceptors.request.use(
-  (config) => {
+  async (config) => {
     // Get initData from Telegram Web App
     if (window.Telegram?.WebApp?.initData) {
-      // Send initData directly in Authorization header without "Bearer " prefix
-      config.headers.Authorization = window.Telegram.WebApp.initData;
-      console.log('[API Service] Request with initData:', config.method.toUpperCase(), config.url);
+      const token = await getSessionToken();
+      // Prefer the compact session token, fall back to raw initData without "Bearer " prefix
+      config.headers.Authorization = token ? `Bearer ${token}` : window.Telegram.WebApp.initData;
+      console.log('[API Service] Request with', token ? 'session token:' : 'initData:', config.method.toUpperCase(), config.url);
     } else {
       console.warn('[API Service] ⚠️ Missing Telegram initData! Request may fail with 401.');
       console.warn('[API Service] Make sure you are opening the app from Telegram.');
@@ -46,6 +86,14 @@ api.interceptors.response.use(
     return response;
   },
   (error) => {
+    // Session token rejected (e.g. server secret rotated): drop it and retry once with a fresh one
+    const authHeader = error.config?.headers?.Authorization;
+    if (error.response?.status === 401 && authHeader?.startsWith('Bearer ') && !error.config._retried) {
+      sessionToken = null;
+      error.config._retried = true;
+      return api.request(error.config);
+    }
+
     // Log detailed error information
     if (error.response) {
       // Server responded with error status
@@ -84,9 +132,9 @@ api.interceptors.response.use(
 // API methods
 export const tasksAPI = {
   /**
-   * Get all tasks
-   * @param {Object} filters - Optional filters (status, priority)
-   * @returns {Promise} List of tasks
+   * Get all tasks, or one page of tasks when `limit` is set
+   * @param {Object} filters - Optional filters (status, priority, limit, cursor)
+   * @returns {Promise} List of tasks; the `x-next-cursor` header holds the next page cursor
    */
   getTasks: (filters = {}) => {
     return api.get('/api/tasks', { params: filters });
@@ -120,6 +168,24 @@ export const tasksAPI = {
     return api.delete(`/api/tasks/${taskId}`);
   },
 
+  /**
+   * Apply several task operations in one request
+   * @param {Array} operations - Items like {op: 'create', task}, {op: 'update', id, changes}, {op: 'delete', id}
+   * @returns {Promise} Per-operation results in request order
+   */
+  batchTasks: (operations) => {
+    return api.post('/api/tasks/batch', { operations });
+  },
+
+  /**
+   * Get tasks changed since a sync version
+   * @param {number} since - Version from the previous sync (0 for a first sync)
+   * @returns {Promise} {version, reset, tasks, deleted}; replace local tasks when reset is true
+   */
+  getTaskChanges: (since = 0) => {
+    return api.get('/api/tasks/changes', { params: { since } });
+  },
+
   /**
    * Get task statistics
    * @returns {Promise} Task statistics
@@ -127,6 +193,61 @@ export const tasksAPI = {
   getStats: () => {
     return api.get('/api/tasks/stats');
   },
+
+  /**
+   * Get the user's profile, first page of tasks and statistics in one request
+   * @param {number} limit - Size of the first page of tasks
+   * @returns {Promise} {user, tasks, next_cursor, stats, version}; load later pages with getTasks({limit, cursor})
+   */
+  bootstrap: (limit = 50) => {
+    return api.get('/api/bootstrap', { params: { limit } });
+  },
+};
+
+/**
+ * Listen for task changes pushed by the server, reconnecting with backoff
+ * @param {Function} onEvent - Called with each {type: 'tasks_changed', version, changed, deleted} event
+ * @returns {Function} Call to stop listening
+ */
+export const subscribeToTaskEvents = (onEvent) => {
+  let socket = null;
+  let stopped = false;
+  let retryDelay = 1000;
+
+  const connect = async () => {
+    const token = window.Telegram?.WebApp?.initData ? await getSessionToken() : null;
+    if (stopped || !token) {
+      return;
+    }
+
+    socket = new WebSocket(`${API_URL.replace(/^http/, 'ws')}/api/tasks/events`);
+
+    socket.onopen = () => {
+      // Authenticate in the first message: URLs end up in proxy and access logs
+      socket.send(JSON.stringify({ type: 'auth', token }));
+      retryDelay = 1000;
+      console.log('[API Service] ✓ Task events connected');
+    };
+    socket.onmessage = (message) => {
+      const event = JSON.parse(message.data);
+      if (event.type === 'tasks_changed') {
+        onEvent(event);
+      }
+    };
+    socket.onclose = () => {
+      if (!stopped) {
+        setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 30000);
+      }
+    };
+  };
+
+  connect();
+
+  return () => {
+    stopped = true;
+    socket?.close();
+  };
 };
 
 export default api;